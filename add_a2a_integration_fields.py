@@ -4,70 +4,86 @@ Migration script to add A2A protocol integration fields to AIAgent table.
 
 import os
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Boolean, String, DateTime, Integer, Text, inspect, text
+from sqlalchemy import Column, Boolean, String, DateTime, Integer, Text, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from _migration_utils import get_engine, get_sessionmaker
 
 # Create a direct connection to the database
 def create_db_connection():
-    """Create a direct SQLAlchemy engine connection to the database"""
-    database_url = os.environ.get('DATABASE_URL')
-    engine = create_engine(database_url)
-    return engine, sessionmaker(bind=engine)()
+    """Get the shared SQLAlchemy engine and a session for the database"""
+    engine = get_engine()
+    return engine, get_sessionmaker()()
 
 def add_a2a_columns():
     """Add A2A protocol integration columns to the AIAgent table"""
     engine, session = create_db_connection()
-    
-    # Check if the columns already exist
-    inspector = inspect(engine)
-    columns = [column['name'] for column in inspector.get_columns('ai_agent')]
-    
-    columns_to_add = []
-    if 'a2a_enabled' not in columns:
-        columns_to_add.append("a2a_enabled BOOLEAN DEFAULT FALSE")
-    
-    if 'bns_identifier' not in columns:
-        columns_to_add.append("bns_identifier VARCHAR(256) UNIQUE")
-    
-    if 'a2a_metadata' not in columns:
-        columns_to_add.append("a2a_metadata TEXT")
-    
-    if 'a2a_last_seen' not in columns:
-        columns_to_add.append("a2a_last_seen TIMESTAMP")
-    
-    if 'a2a_interaction_count' not in columns:
-        columns_to_add.append("a2a_interaction_count INTEGER DEFAULT 0")
-    
-    if 'purpose_code' not in columns:
-        columns_to_add.append("purpose_code VARCHAR(20)")
-    
-    if 'entity_code' not in columns:
-        columns_to_add.append("entity_code VARCHAR(50)")
-    
-    # Add the new columns if they don't exist
-    if columns_to_add:
+
+    columns_to_add = [
+        "a2a_enabled BOOLEAN DEFAULT FALSE",
+        "bns_identifier VARCHAR(256) UNIQUE",
+        "a2a_metadata TEXT",
+        "a2a_last_seen TIMESTAMP",
+        "a2a_interaction_count INTEGER DEFAULT 0",
+        "purpose_code VARCHAR(20)",
+        "entity_code VARCHAR(50)",
+    ]
+
+    # IF NOT EXISTS makes the ALTER idempotent server-side, so no
+    # inspector precheck round-trip is needed
+    if engine.dialect.name == 'sqlite':
+        # SQLite only supports one ADD COLUMN per ALTER TABLE and lacks
+        # IF NOT EXISTS, so catch duplicate-column errors instead
         for column_def in columns_to_add:
             try:
-                # Add column to the table
                 sql = text(f"ALTER TABLE ai_agent ADD COLUMN {column_def}")
                 session.execute(sql)
                 print(f"Added column {column_def.split()[0]} to AIAgent table")
             except Exception as e:
-                print(f"Error adding column {column_def.split()[0]}: {e}")
-        
-        session.commit()
-        print("A2A columns added to AIAgent table")
+                if 'duplicate column name' in str(e).lower():
+                    session.rollback()
+                    print(f"Column {column_def.split()[0]} already exists in AIAgent table")
+                else:
+                    print(f"Error adding column {column_def.split()[0]}: {e}")
     else:
-        print("All A2A columns already exist in AIAgent table")
-    
+        # Fold all ADD COLUMNs into one ALTER TABLE so the table is
+        # rewritten/locked once instead of once per column
+        sql = text(
+            "ALTER TABLE ai_agent ADD COLUMN IF NOT EXISTS "
+            + ", ADD COLUMN IF NOT EXISTS ".join(columns_to_add)
+        )
+        session.execute(sql)
+        print("A2A columns added to AIAgent table")
+
+    session.commit()
     session.close()
 
+def create_a2a_discovery_index():
+    """Create a partial index for A2A discovery lookups on active agents"""
+    engine = get_engine()
+    try:
+        if engine.dialect.name == 'sqlite':
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "CREATE INDEX IF NOT EXISTS ix_ai_agent_a2a_active "
+                    "ON ai_agent (a2a_last_seen) WHERE a2a_enabled = 1"
+                ))
+        else:
+            # CONCURRENTLY cannot run inside a transaction block
+            with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+                conn.execute(text(
+                    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_ai_agent_a2a_active "
+                    "ON ai_agent (a2a_last_seen) WHERE a2a_enabled = TRUE"
+                ))
+        print("A2A discovery index ix_ai_agent_a2a_active is in place")
+    except Exception as e:
+        print(f"Error creating A2A discovery index: {e}")
+
 def run_migration():
     """Run the database migration to add A2A protocol integration fields to AIAgent"""
     try:
         print("Starting A2A protocol integration fields migration...")
         add_a2a_columns()
+        create_a2a_discovery_index()
         print("A2A protocol integration fields migration completed successfully")
         return True
     except Exception as e:
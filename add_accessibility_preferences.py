@@ -42,14 +42,16 @@ def add_accessibility_column():
                 'auto_announce_changes': False
             }
             
-            # Update all users with default preferences
-            users = User.query.all()
-            for user in users:
-                if not user.accessibility_preferences:
-                    user.accessibility_preferences = json.dumps(default_prefs)
-            
+            # Update all users with default preferences in one server-side
+            # statement instead of loading and dirtying each row in the ORM
+            default_json = json.dumps(default_prefs)
+            result = db.session.execute(
+                db.text('UPDATE "user" SET accessibility_preferences = :prefs '
+                        'WHERE accessibility_preferences IS NULL'),
+                {'prefs': default_json}
+            )
             db.session.commit()
-            print(f"Set default accessibility preferences for {len(users)} users")
+            print(f"Set default accessibility preferences for {result.rowcount} users")
         except Exception as e:
             db.session.rollback()
             print(f"Error setting default preferences: {str(e)}")
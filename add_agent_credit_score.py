@@ -6,8 +6,9 @@ This adds:
 3. A balance_after column to the Transaction table
 """
 
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, Float, String, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, ForeignKey, Text, Boolean
 from sqlalchemy.sql import text
+from _migration_utils import DATABASE_URL, get_inspector
 from datetime import datetime
 import logging
 import os
@@ -19,9 +20,12 @@ logger = logging.getLogger(__name__)
 
 def run_migration():
     """Run the database migration to add credit score functionality to AI Agents"""
-    # Get database URL from environment or use a default for development
-    database_url = os.environ.get('DATABASE_URL', 'sqlite:///instance/tradeline.db')
-    
+    # Get database URL from shared config or use a default for development
+    database_url = DATABASE_URL
+    if not database_url:
+        database_url = 'sqlite:///instance/tradeline.db'
+        logger.warning(f"DATABASE_URL not set; falling back to {database_url}")
+
     # Connect to the database
     logger.info(f"Connecting to database...")
     engine = create_engine(database_url)
@@ -31,51 +35,65 @@ def run_migration():
         # Begin a transaction
         transaction = connection.begin()
         try:
-            # Create a metadata object
-            metadata = MetaData()
-            metadata.reflect(bind=engine)
-            
+            # Inspect only the tables we touch instead of reflecting
+            # the entire schema
+            inspector = get_inspector(engine)
+
             # 1. Add credit score columns to AIAgent table if they don't exist
-            if 'ai_agent' in metadata.tables:
-                # Check if the credit_score column already exists
-                ai_agent_table = metadata.tables['ai_agent']
-                
-                # Add credit_score column if it doesn't exist
-                if 'credit_score' not in ai_agent_table.c:
-                    logger.info("Adding credit_score column to ai_agent table")
-                    connection.execute(text(
-                        "ALTER TABLE ai_agent ADD COLUMN credit_score INTEGER DEFAULT 600"
-                    ))
-                    
-                # Add credit_score_updated column if it doesn't exist
-                if 'credit_score_updated' not in ai_agent_table.c:
-                    logger.info("Adding credit_score_updated column to ai_agent table")
-                    # SQLite doesn't support DEFAULT CURRENT_TIMESTAMP when adding columns
-                    connection.execute(text(
-                        "ALTER TABLE ai_agent ADD COLUMN credit_score_updated DATETIME"
-                    ))
-                    # Set default values for existing rows
-                    connection.execute(text(
-                        "UPDATE ai_agent SET credit_score_updated = CURRENT_TIMESTAMP"
-                    ))
-                    
-                # Add credit_score_history column if it doesn't exist
-                if 'credit_score_history' not in ai_agent_table.c:
-                    logger.info("Adding credit_score_history column to ai_agent table")
-                    connection.execute(text(
-                        "ALTER TABLE ai_agent ADD COLUMN credit_score_history TEXT"
-                    ))
+            if inspector.has_table('ai_agent'):
+                # Check which credit score columns already exist
+                ai_agent_columns = {c['name'] for c in inspector.get_columns('ai_agent')}
+
+                if engine.dialect.name == 'sqlite':
+                    # SQLite only supports one ADD COLUMN per ALTER TABLE and
+                    # rejects DEFAULT CURRENT_TIMESTAMP when adding columns
+                    if 'credit_score' not in ai_agent_columns:
+                        logger.info("Adding credit_score column to ai_agent table")
+                        connection.execute(text(
+                            "ALTER TABLE ai_agent ADD COLUMN credit_score INTEGER DEFAULT 600"
+                        ))
+
+                    if 'credit_score_updated' not in ai_agent_columns:
+                        logger.info("Adding credit_score_updated column to ai_agent table")
+                        connection.execute(text(
+                            "ALTER TABLE ai_agent ADD COLUMN credit_score_updated DATETIME"
+                        ))
+                        # Set default values for existing rows
+                        connection.execute(text(
+                            "UPDATE ai_agent SET credit_score_updated = CURRENT_TIMESTAMP"
+                        ))
+
+                    if 'credit_score_history' not in ai_agent_columns:
+                        logger.info("Adding credit_score_history column to ai_agent table")
+                        connection.execute(text(
+                            "ALTER TABLE ai_agent ADD COLUMN credit_score_history TEXT"
+                        ))
+                else:
+                    # Combine the ADD COLUMNs into one ALTER TABLE so the table
+                    # is only rewritten once; the DEFAULT also backfills the
+                    # timestamp, making a separate UPDATE unnecessary
+                    clauses = []
+                    if 'credit_score' not in ai_agent_columns:
+                        clauses.append("ADD COLUMN credit_score INTEGER DEFAULT 600")
+                    if 'credit_score_updated' not in ai_agent_columns:
+                        clauses.append("ADD COLUMN credit_score_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP")
+                    if 'credit_score_history' not in ai_agent_columns:
+                        clauses.append("ADD COLUMN credit_score_history TEXT")
+
+                    if clauses:
+                        logger.info("Adding credit score columns to ai_agent table")
+                        connection.execute(text(f"ALTER TABLE ai_agent {', '.join(clauses)}"))
             else:
                 logger.error("ai_agent table does not exist. Migration cannot proceed.")
                 transaction.rollback()
                 return
             
             # 2. Add balance_after column to Transaction table if it doesn't exist
-            if 'transaction' in metadata.tables:
+            if inspector.has_table('transaction'):
                 # Check if the balance_after column already exists
-                transaction_table = metadata.tables['transaction']
-                
-                if 'balance_after' not in transaction_table.c:
+                transaction_columns = {c['name'] for c in inspector.get_columns('transaction')}
+
+                if 'balance_after' not in transaction_columns:
                     logger.info("Adding balance_after column to transaction table")
                     # Use quotes around 'transaction' as it's a reserved keyword in SQLite
                     connection.execute(text(
@@ -84,11 +102,11 @@ def run_migration():
             else:
                 logger.warning("transaction table does not exist. Skipping transaction table updates.")
             
-            # 3. Create the Repayment table if it doesn't exist
-            if 'repayment' not in metadata.tables:
-                logger.info("Creating repayment table")
-                connection.execute(text("""
-                    CREATE TABLE repayment (
+            # 3. Create the Repayment table if it doesn't exist.
+            # IF NOT EXISTS makes this idempotent without a reflection check.
+            logger.info("Creating repayment table if it does not exist")
+            connection.execute(text("""
+                    CREATE TABLE IF NOT EXISTS repayment (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
                         agent_id INTEGER NOT NULL,
                         tradeline_allocation_id INTEGER NOT NULL,
@@ -101,9 +119,7 @@ def run_migration():
                         FOREIGN KEY (tradeline_allocation_id) REFERENCES ai_agent_allocation (id)
                     )
                 """))
-            else:
-                logger.info("repayment table already exists")
-            
+
             # Commit the transaction
             transaction.commit()
             logger.info("Migration completed successfully")
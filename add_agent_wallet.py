@@ -6,16 +6,33 @@ import os
 import sys
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from sqlalchemy import text
+from sqlalchemy import text, update, bindparam
 from app import app, db
 from models import AIAgent
 from modules.crypto_wallet import CryptoWalletManager
+from _migration_utils import has_column
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Batch size for streaming agents and committing wallet updates
+CHUNK_SIZE = 500
+# Parallel wallet-creation workers (wallet generation is I/O-bound)
+MAX_WORKERS = 16
+
+# Built once so every chunk reuses the same compiled statement and the
+# driver can batch the parameter sets through executemany. The statement
+# targets the Core table: an ORM-entity UPDATE with extra WHERE criteria
+# rejects executemany parameter lists under SQLAlchemy 2.0
+WALLET_UPDATE_STMT = (
+    update(AIAgent.__table__)
+    .where(AIAgent.__table__.c.id == bindparam('aid'))
+    .values(wallet_address=bindparam('addr'), wallet_created_date=bindparam('dt'))
+)
+
 # Use the database session from app
 try:
     session = db.session
@@ -27,16 +44,8 @@ except Exception as e:
 def add_wallet_columns():
     """Check if wallet columns exist and add them if they don't"""
     try:
-        # For SQLite, query the pragma table info to check if column exists
-        result = session.execute(text(
-            """
-            PRAGMA table_info(ai_agent)
-            """
-        ))
-        
-        columns = [row[1] for row in result.fetchall()]
-        
-        if 'wallet_address' not in columns:
+        # Single-row EXISTS probe instead of fetching the full column listing
+        if not has_column(session, 'ai_agent', 'wallet_address'):
             logger.info("Adding wallet columns to AIAgent table...")
             
             # Add the wallet columns one by one (SQLite limitation)
@@ -54,40 +63,64 @@ def add_wallet_columns():
         logger.error(f"Error adding wallet columns: {e}")
         sys.exit(1)
 
+def _create_wallet_for_agent(agent_info):
+    """Create a wallet for one agent, returning (agent_id, address) or None on failure"""
+    agent_id, agent_name, network = agent_info
+    try:
+        wallet_address = CryptoWalletManager.create_agent_wallet(network=network)
+        logger.info(f"Created {network} wallet for agent {agent_id} ({agent_name}): {wallet_address}")
+        return (agent_id, wallet_address)
+    except Exception as e:
+        logger.warning(f"Error creating wallet for agent {agent_id}: {e}")
+        return None
+
 def update_existing_agents():
     """Create wallet addresses for existing AI Agents"""
     try:
-        # Get all agents without wallet addresses
-        agents = session.query(AIAgent).filter(AIAgent.wallet_address.is_(None)).all()
-        
-        if not agents:
+        # Stream plain row tuples instead of hydrating AIAgent ORM
+        # instances; the migration only needs three columns
+        agents = session.execute(
+            text("SELECT id, name, wallet_network FROM ai_agent WHERE wallet_address IS NULL")
+        ).yield_per(CHUNK_SIZE)
+
+        total_updated = 0
+        chunk = []
+        for agent_id, agent_name, wallet_network in agents:
+            chunk.append((agent_id, agent_name, wallet_network or 'mainnet'))
+            if len(chunk) >= CHUNK_SIZE:
+                total_updated += _flush_wallet_chunk(chunk)
+                chunk = []
+        if chunk:
+            total_updated += _flush_wallet_chunk(chunk)
+
+        if not total_updated:
             logger.info("No agents found without wallet addresses.")
             return
-        
-        logger.info(f"Found {len(agents)} agents without wallet addresses.")
-        
-        # Create wallet for each agent
-        for agent in agents:
-            try:
-                network = agent.wallet_network or 'mainnet'
-                wallet_address = CryptoWalletManager.create_agent_wallet(network=network)
-                
-                agent.wallet_address = wallet_address
-                agent.wallet_created_date = datetime.utcnow()
-                
-                logger.info(f"Created {network} wallet for agent {agent.id} ({agent.name}): {wallet_address}")
-            except Exception as e:
-                logger.warning(f"Error creating wallet for agent {agent.id}: {e}")
-                continue
-        
-        session.commit()
-        logger.info("Wallet migration completed successfully.")
-    
+
+        logger.info(f"Wallet migration completed successfully for {total_updated} agents.")
+
     except Exception as e:
         session.rollback()
         logger.error(f"Error updating agents with wallets: {e}")
         sys.exit(1)
 
+def _flush_wallet_chunk(chunk):
+    """Generate wallets for a chunk of agents in parallel and bulk-update them"""
+    # Wallet creation blocks on signing/RPC, so overlap the calls in a thread pool
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = [r for r in executor.map(_create_wallet_for_agent, chunk) if r]
+
+    if not results:
+        return 0
+
+    now = datetime.utcnow()
+    session.execute(
+        WALLET_UPDATE_STMT,
+        [{'aid': agent_id, 'addr': address, 'dt': now} for agent_id, address in results]
+    )
+    session.commit()
+    return len(results)
+
 def run_migration():
     """Run the database migration to add wallet functionality to AI Agents"""
     try:
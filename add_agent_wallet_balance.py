@@ -5,6 +5,7 @@ This balance will be used to track stablecoin holdings from DeFi loans.
 import sys
 import logging
 from datetime import datetime
+from sqlalchemy.exc import OperationalError
 from app import db, app
 
 # Configure logging
@@ -15,21 +16,19 @@ def add_wallet_balance_column():
     """Add wallet_balance column to the AIAgent table"""
     try:
         with app.app_context():
-            # Check if column exists first
-            conn = db.engine.connect()
-            inspector = db.inspect(db.engine)
-            columns = inspector.get_columns('ai_agent')
-            column_names = [column['name'] for column in columns]
-            
-            if 'wallet_balance' not in column_names:
+            # Idempotent server-side ALTER: one round-trip, no precheck
+            with db.engine.begin() as conn:
                 logger.info("Adding wallet_balance column to AIAgent table...")
-                conn.execute(db.text("ALTER TABLE ai_agent ADD COLUMN wallet_balance FLOAT DEFAULT 0.0"))
-                conn.commit()
-                logger.info("wallet_balance column added successfully.")
-            else:
-                logger.info("wallet_balance column already exists.")
-            
-            conn.close()
+                if db.engine.dialect.name == 'sqlite':
+                    # SQLite lacks ADD COLUMN IF NOT EXISTS
+                    try:
+                        conn.execute(db.text("ALTER TABLE ai_agent ADD COLUMN wallet_balance FLOAT DEFAULT 0.0"))
+                    except OperationalError as e:
+                        if 'duplicate column name' not in str(e).lower():
+                            raise
+                        logger.info("wallet_balance column already exists.")
+                else:
+                    conn.execute(db.text("ALTER TABLE ai_agent ADD COLUMN IF NOT EXISTS wallet_balance FLOAT DEFAULT 0.0"))
             return True
     except Exception as e:
         logger.error(f"Error adding wallet_balance column: {str(e)}")
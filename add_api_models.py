@@ -9,25 +9,22 @@ This adds:
 import os
 import sys
 from datetime import datetime
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Float, Text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import relationship
+from _migration_utils import DATABASE_URL, get_engine, get_sessionmaker
 
 # Create a direct SQLAlchemy engine connection to the database
 def create_db_connection():
-    """Create a direct SQLAlchemy engine connection to the database"""
-    database_url = os.environ.get("DATABASE_URL")
-    if not database_url:
+    """Get the shared SQLAlchemy engine and a session for the database"""
+    if not DATABASE_URL:
         print("Error: DATABASE_URL environment variable not set")
         sys.exit(1)
-    
-    # Create SQLAlchemy engine
-    engine = create_engine(database_url)
-    
-    # Create session
-    Session = sessionmaker(bind=engine)
-    session = Session()
-    
+
+    # Reuse the shared engine so chained migrations skip pool setup
+    engine = get_engine()
+    session = get_sessionmaker()()
+
     return engine, session
 
 # Define the base class
@@ -79,29 +76,21 @@ def add_api_models():
     """Add API models to the database"""
     engine, session = create_db_connection()
     
-    # Create inspector to check if tables exist
-    from sqlalchemy import inspect
-    inspector = inspect(engine)
-    
-    # Check if tables already exist
-    if 'api_key' not in inspector.get_table_names():
-        APIKey.__table__.create(engine)
-        print("Created APIKey table")
-    else:
-        print("APIKey table already exists")
-    
-    if 'api_usage' not in inspector.get_table_names():
-        APIUsage.__table__.create(engine)
-        print("Created APIUsage table")
-    else:
-        print("APIUsage table already exists")
-    
-    if 'api_subscription' not in inspector.get_table_names():
-        APISubscription.__table__.create(engine)
-        print("Created APISubscription table")
-    else:
-        print("APISubscription table already exists")
-    
+    # Use the shared inspector so the table listing is reflected once
+    from _migration_utils import get_inspector
+    inspector = get_inspector(engine)
+
+    # Create all missing tables in one pass; checkfirst issues a single
+    # table-name lookup instead of one round-trip per table
+    existing_tables = set(inspector.get_table_names())
+    Base.metadata.create_all(bind=engine, checkfirst=True)
+
+    for table_name in ('api_key', 'api_usage', 'api_subscription'):
+        if table_name in existing_tables:
+            print(f"{table_name} table already exists")
+        else:
+            print(f"Created {table_name} table")
+
     # Close session
     session.close()
 
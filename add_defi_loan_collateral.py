@@ -7,7 +7,7 @@ This adds:
 4. collateral_liquidated column (Boolean)
 5. liquidation_date column (DateTime)
 """
-from sqlalchemy import Column, Boolean, Integer, Float, DateTime, ForeignKey, inspect
+from sqlalchemy import Column, Boolean, Integer, Float, DateTime, ForeignKey
 from sqlalchemy.exc import OperationalError
 from sqlalchemy.sql import text
 from datetime import datetime
@@ -16,32 +16,42 @@ from app import db, app
 def add_collateral_columns():
     """Add collateral columns to the DefiLoan table"""
     with app.app_context():
-        inspector = inspect(db.engine)
-        existing_columns = [column['name'] for column in inspector.get_columns('defi_loan')]
-        
-        if 'has_collateral' in existing_columns:
-            print("Collateral columns already exist in DefiLoan table. Skipping migration.")
-            return False
-        
         print("Adding collateral columns to DefiLoan table...")
-        
+
         # Using SQLAlchemy session with raw SQL via text()
         with db.engine.connect() as conn:
-            # Add has_collateral column
-            conn.execute(text("ALTER TABLE defi_loan ADD COLUMN has_collateral BOOLEAN DEFAULT 0"))
-            
-            # Add collateral_allocation_id column
-            conn.execute(text("ALTER TABLE defi_loan ADD COLUMN collateral_allocation_id INTEGER REFERENCES ai_agent_allocation(id)"))
-            
-            # Add collateral_amount column
-            conn.execute(text("ALTER TABLE defi_loan ADD COLUMN collateral_amount FLOAT"))
-            
-            # Add collateral_liquidated column 
-            conn.execute(text("ALTER TABLE defi_loan ADD COLUMN collateral_liquidated BOOLEAN DEFAULT 0"))
-            
-            # Add liquidation_date column
-            conn.execute(text("ALTER TABLE defi_loan ADD COLUMN liquidation_date DATETIME"))
-            
+            if db.engine.dialect.name == 'sqlite':
+                # SQLite only supports one ADD COLUMN per ALTER TABLE and
+                # lacks IF NOT EXISTS, so catch duplicate-column errors;
+                # SQLite spells boolean defaults and datetimes differently
+                column_defs = [
+                    "has_collateral BOOLEAN DEFAULT 0",
+                    "collateral_allocation_id INTEGER REFERENCES ai_agent_allocation(id)",
+                    "collateral_amount FLOAT",
+                    "collateral_liquidated BOOLEAN DEFAULT 0",
+                    "liquidation_date DATETIME",
+                ]
+                for column_def in column_defs:
+                    try:
+                        conn.execute(text(f"ALTER TABLE defi_loan ADD COLUMN {column_def}"))
+                    except OperationalError as e:
+                        if 'duplicate column name' not in str(e).lower():
+                            raise
+            else:
+                # One idempotent multi-clause ALTER: a single round-trip and
+                # one exclusive lock on defi_loan, with no inspector precheck
+                column_defs = [
+                    "has_collateral BOOLEAN DEFAULT FALSE",
+                    "collateral_allocation_id INTEGER REFERENCES ai_agent_allocation(id)",
+                    "collateral_amount FLOAT",
+                    "collateral_liquidated BOOLEAN DEFAULT FALSE",
+                    "liquidation_date TIMESTAMP",
+                ]
+                conn.execute(text(
+                    "ALTER TABLE defi_loan ADD COLUMN IF NOT EXISTS "
+                    + ", ADD COLUMN IF NOT EXISTS ".join(column_defs)
+                ))
+
             conn.commit()
         
         print("Migration completed successfully!")
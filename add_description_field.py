@@ -6,24 +6,27 @@ sys.path.insert(0, os.path.abspath('.'))
 
 from app import app, db
 from sqlalchemy import Column, Text, text
+from sqlalchemy.exc import OperationalError
 
 def add_description_column():
     """Add description column to the tradeline table"""
     with app.app_context():
-        # Add description column using db session execute
+        # Idempotent ALTER: no inspector precheck round-trip needed
         engine = db.engine
-        inspector = db.inspect(engine)
-        
-        # Check if the column already exists
-        columns = [col['name'] for col in inspector.get_columns('tradeline')]
-        if 'description' not in columns:
-            print("Adding description column to tradeline table...")
-            with engine.connect() as conn:
-                conn.execute(text('ALTER TABLE tradeline ADD COLUMN description TEXT'))
-                conn.commit()
-            print("Description column added successfully.")
-        else:
-            print("Description column already exists in tradeline table.")
+        print("Adding description column to tradeline table...")
+        with engine.connect() as conn:
+            if engine.dialect.name == 'sqlite':
+                # SQLite lacks ADD COLUMN IF NOT EXISTS
+                try:
+                    conn.execute(text('ALTER TABLE tradeline ADD COLUMN description TEXT'))
+                except OperationalError as e:
+                    if 'duplicate column name' not in str(e).lower():
+                        raise
+                    print("Description column already exists in tradeline table.")
+            else:
+                conn.execute(text('ALTER TABLE tradeline ADD COLUMN IF NOT EXISTS description TEXT'))
+            conn.commit()
+        print("Description column migration complete.")
 
 if __name__ == "__main__":
     add_description_column()
\ No newline at end of file
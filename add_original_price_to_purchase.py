@@ -7,44 +7,56 @@ import os
 import logging
 from datetime import datetime
 
-from sqlalchemy import create_engine, MetaData, Table, Column, Float, inspect, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+from _migration_utils import get_engine, table_columns
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rows updated per backfill transaction
+BACKFILL_CHUNK_SIZE = 10000
+
 def create_db_connection():
-    """Create a direct SQLAlchemy engine connection to the database"""
-    db_url = os.environ.get('DATABASE_URL')
-    logger.info(f"Connecting to database: {db_url}")
-    engine = create_engine(db_url)
-    return engine
+    """Get the shared SQLAlchemy engine for the database"""
+    logger.info("Connecting to database...")
+    return get_engine()
 
 def add_original_price_column():
     """Add original_price column to the TradelinePurchase table"""
     engine = create_db_connection()
-    metadata = MetaData()
-    metadata.reflect(engine)
-    
-    inspector = inspect(engine)
-    table_exists = 'tradeline_purchase' in inspector.get_table_names()
-    
-    if not table_exists:
+
+    # One query answers both the table- and column-existence checks
+    with engine.connect() as conn:
+        columns = table_columns(conn, 'tradeline_purchase')
+
+    if not columns:
         logger.error("The tradeline_purchase table doesn't exist in the database.")
         return False
-    
-    columns = [col['name'] for col in inspector.get_columns('tradeline_purchase')]
+
     if 'original_price' in columns:
         logger.info("The 'original_price' column already exists in the tradeline_purchase table.")
         return True
-    
+
     # Add the column
     with engine.begin() as conn:
         conn.execute(text("ALTER TABLE tradeline_purchase ADD COLUMN original_price FLOAT"))
-        
-        # Set original_price equal to price_paid for existing records
-        conn.execute(text("UPDATE tradeline_purchase SET original_price = price_paid"))
-        
+
+    # Backfill original_price from price_paid in id-range chunks with a
+    # commit per chunk, so a large table is never locked by one huge UPDATE
+    with engine.connect() as conn:
+        max_id = conn.execute(text("SELECT MAX(id) FROM tradeline_purchase")).scalar() or 0
+
+    lo = 1
+    while lo <= max_id:
+        hi = lo + BACKFILL_CHUNK_SIZE - 1
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE tradeline_purchase SET original_price = price_paid "
+                     "WHERE id BETWEEN :lo AND :hi AND original_price IS NULL"),
+                {'lo': lo, 'hi': hi}
+            )
+        lo = hi + 1
+
     logger.info("Successfully added 'original_price' column to tradeline_purchase table.")
     return True
 
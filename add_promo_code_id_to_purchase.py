@@ -7,56 +7,121 @@ import os
 import logging
 from datetime import datetime
 
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, inspect, text
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import text
+from _migration_utils import get_engine, table_columns
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def create_db_connection():
-    """Create a direct SQLAlchemy engine connection to the database"""
-    db_url = os.environ.get('DATABASE_URL')
-    logger.info(f"Connecting to database: {db_url}")
-    engine = create_engine(db_url)
-    return engine
+    """Get the shared SQLAlchemy engine for the database"""
+    logger.info("Connecting to database...")
+    return get_engine()
+
+# Columns this migration owns, as (name, definition) pairs; new columns
+# for tradeline_purchase should be appended here so one ALTER adds them all
+COLUMNS_TO_ADD = [
+    ('promo_code_id', 'promo_code_id INTEGER'),
+]
 
 def add_promo_code_id_column():
     """Add promo_code_id column to the TradelinePurchase table"""
     engine = create_db_connection()
-    metadata = MetaData()
-    metadata.reflect(engine)
-    
-    inspector = inspect(engine)
-    table_exists = 'tradeline_purchase' in inspector.get_table_names()
-    
-    if not table_exists:
+
+    # One query answers both the table- and column-existence checks
+    with engine.connect() as conn:
+        columns = table_columns(conn, 'tradeline_purchase')
+
+    if not columns:
         logger.error("The tradeline_purchase table doesn't exist in the database.")
         return False
-    
-    columns = [col['name'] for col in inspector.get_columns('tradeline_purchase')]
-    if 'promo_code_id' in columns:
+
+    missing = [definition for name, definition in COLUMNS_TO_ADD if name not in columns]
+    if not missing:
         logger.info("The 'promo_code_id' column already exists in the tradeline_purchase table.")
         return True
-    
-    # Add the column
+
+    # One multi-clause ALTER covers every missing column in a single
+    # round-trip and table pass; freshly added nullable columns are
+    # already NULL everywhere, so no backfill UPDATE is needed
     with engine.begin() as conn:
-        conn.execute(text("ALTER TABLE tradeline_purchase ADD COLUMN promo_code_id INTEGER"))
-        
-        # Set default value to null
-        conn.execute(text("UPDATE tradeline_purchase SET promo_code_id = NULL"))
-        
+        conn.execute(text(
+            "ALTER TABLE tradeline_purchase ADD COLUMN " + ", ADD COLUMN ".join(missing)
+        ))
+
     logger.info("Successfully added 'promo_code_id' column to tradeline_purchase table.")
     return True
 
+def backfill_promo_code_ids(pairs, page_size=5000):
+    """Backfill promo_code_id for (purchase_id, promo_code_id) pairs.
+
+    Pages thousands of per-row UPDATEs into one VALUES-joined statement
+    per page via execute_values on PostgreSQL; other dialects fall back
+    to driver executemany.
+    """
+    if not pairs:
+        return 0
+
+    engine = create_db_connection()
+    if engine.dialect.name == 'postgresql':
+        from psycopg2.extras import execute_values
+
+        raw_conn = engine.raw_connection()
+        try:
+            with raw_conn.cursor() as cursor:
+                execute_values(
+                    cursor,
+                    "UPDATE tradeline_purchase AS t SET promo_code_id = v.pid "
+                    "FROM (VALUES %s) AS v(id, pid) WHERE t.id = v.id",
+                    pairs,
+                    page_size=page_size
+                )
+            raw_conn.commit()
+        except Exception:
+            raw_conn.rollback()
+            raise
+        finally:
+            raw_conn.close()
+    else:
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE tradeline_purchase SET promo_code_id = :pid WHERE id = :id"),
+                [{'id': purchase_id, 'pid': promo_code_id} for purchase_id, promo_code_id in pairs]
+            )
+
+    logger.info(f"Backfilled promo_code_id for {len(pairs)} purchases.")
+    return len(pairs)
+
+def rollback():
+    """Revert the migration by dropping the promo_code_id column"""
+    engine = create_db_connection()
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE tradeline_purchase DROP COLUMN IF EXISTS promo_code_id"))
+    logger.info("Rolled back promo_code_id column from tradeline_purchase table.")
+
+def postcheck():
+    """Verify the migration left the expected schema in place"""
+    engine = create_db_connection()
+    with engine.connect() as conn:
+        ok = 'promo_code_id' in table_columns(conn, 'tradeline_purchase')
+    logger.info(f"Postcheck {'passed' if ok else 'FAILED'}: promo_code_id present={ok}")
+    return ok
+
 def run_migration():
     """Run the database migration to add promo_code_id functionality to TradelinePurchase"""
     logger.info("Starting migration to add promo_code_id column to TradelinePurchase table")
     success = add_promo_code_id_column()
-    
+
     if success:
         logger.info("Migration completed successfully!")
     else:
         logger.error("Migration failed!")
 
 if __name__ == "__main__":
-    run_migration()
\ No newline at end of file
+    import sys
+    if '--rollback' in sys.argv:
+        rollback()
+    elif '--postcheck' in sys.argv:
+        postcheck()
+    else:
+        run_migration()
\ No newline at end of file
@@ -1,18 +1,30 @@
 from app import app, db
 import logging
-import psycopg2
 import os
 
+try:
+    # psycopg3: server-side parameter binding, native prepared statements
+    # and binary protocol cut per-statement parse/plan overhead
+    import psycopg
+except ImportError:
+    import psycopg2 as psycopg
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Columns this migration owns, as (name, definition) pairs; new columns
+# for tradeline should be appended here so one ALTER adds them all
+COLUMNS_TO_ADD = [
+    ('rental_duration', 'rental_duration INTEGER DEFAULT 1'),
+]
+
 def add_rental_duration_column():
     """Add rental_duration column to Tradeline table"""
     try:
         logger.info("Adding rental_duration column to Tradeline table...")
-        
-        # Connect directly to the database using psycopg2 rather than SQLAlchemy
+
+        # Connect directly to the database using psycopg rather than SQLAlchemy
         connection_params = {
             'dbname': os.environ.get('PGDATABASE'),
             'user': os.environ.get('PGUSER'),
@@ -20,27 +32,31 @@ def add_rental_duration_column():
             'host': os.environ.get('PGHOST'),
             'port': os.environ.get('PGPORT')
         }
-        
-        conn = psycopg2.connect(**connection_params)
+
+        conn = psycopg.connect(**connection_params)
         conn.autocommit = True  # Set autocommit mode to avoid transaction issues
-        
+
         with conn.cursor() as cursor:
-            # Check if column exists
-            cursor.execute("""
-                SELECT column_name 
-                FROM information_schema.columns 
-                WHERE table_name='tradeline' AND column_name='rental_duration'
-            """)
-            
-            column_exists = cursor.fetchone() is not None
-            
-            if not column_exists:
+            # Check which columns already exist; parameterized so the
+            # server can cache/prepare the plan across invocations
+            cursor.execute(
+                "SELECT column_name FROM information_schema.columns "
+                "WHERE table_name = %s",
+                ("tradeline",)
+            )
+
+            existing = {row[0] for row in cursor.fetchall()}
+            missing = [definition for name, definition in COLUMNS_TO_ADD if name not in existing]
+
+            if missing:
                 logger.info("Adding rental_duration column...")
-                cursor.execute("ALTER TABLE tradeline ADD COLUMN rental_duration INTEGER DEFAULT 1")
+                # One multi-clause ALTER amortizes the table pass across
+                # every missing column
+                cursor.execute("ALTER TABLE tradeline ADD COLUMN " + ", ADD COLUMN ".join(missing))
                 logger.info("rental_duration column added successfully.")
             else:
                 logger.info("rental_duration column already exists.")
-        
+
         conn.close()
         logger.info("Database migration completed successfully.")
         
@@ -48,5 +64,45 @@ def add_rental_duration_column():
         logger.error(f"Error adding rental_duration column: {str(e)}")
         raise
 
+def _connect():
+    """Open an autocommit connection with the script's PG settings"""
+    conn = psycopg.connect(
+        dbname=os.environ.get('PGDATABASE'),
+        user=os.environ.get('PGUSER'),
+        password=os.environ.get('PGPASSWORD'),
+        host=os.environ.get('PGHOST'),
+        port=os.environ.get('PGPORT')
+    )
+    conn.autocommit = True
+    return conn
+
+def rollback():
+    """Revert the migration by dropping the rental_duration column"""
+    conn = _connect()
+    with conn.cursor() as cursor:
+        cursor.execute("ALTER TABLE tradeline DROP COLUMN IF EXISTS rental_duration")
+    conn.close()
+    logger.info("Rolled back rental_duration column from tradeline table.")
+
+def postcheck():
+    """Verify the migration left the expected schema in place"""
+    conn = _connect()
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = %s AND column_name = %s",
+            ("tradeline", "rental_duration")
+        )
+        ok = cursor.fetchone() is not None
+    conn.close()
+    logger.info(f"Postcheck {'passed' if ok else 'FAILED'}: rental_duration present={ok}")
+    return ok
+
 if __name__ == "__main__":
-    add_rental_duration_column()
\ No newline at end of file
+    import sys
+    if '--rollback' in sys.argv:
+        rollback()
+    elif '--postcheck' in sys.argv:
+        postcheck()
+    else:
+        add_rental_duration_column()
\ No newline at end of file
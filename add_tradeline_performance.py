@@ -7,13 +7,35 @@ This script will:
 """
 
 from datetime import datetime, timedelta
+from io import StringIO
+import numpy as np
 from app import app, db
 from models import Tradeline, AIAgentAllocation, Transaction, Repayment
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, func, case, and_, or_, text
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# Rows per batched INSERT when backfilling performance records
+INSERT_BATCH_SIZE = 1000
+
+# Advisory-lock key guarding the backfill against concurrent workers
+BACKFILL_LOCK_KEY = 0x7A3B5A31
+
+# Above this row count the PostgreSQL backfill switches to COPY, which
+# skips per-statement SQL parsing entirely
+COPY_THRESHOLD = 1000
+
+# Column order shared by the COPY statement and its row serialization.
+# record_date is listed explicitly: its client-side default is invisible
+# to COPY, which would otherwise leave the column NULL
+PERFORMANCE_COLUMNS = (
+    'tradeline_id', 'record_date', 'current_balance', 'available_credit', 'utilization_rate',
+    'transaction_count', 'transaction_volume', 'avg_transaction_amount',
+    'total_repayments', 'repayments_on_time', 'repayments_late',
+    'payment_ratio', 'risk_score', 'days_delinquent', 'interest_accrued',
+)
+
 class TradelinePerformance(Base):
     """Historical performance metrics for tradelines"""
     __tablename__ = 'tradeline_performance'
@@ -43,11 +65,19 @@ class TradelinePerformance(Base):
     days_delinquent = Column(Integer, default=0)
     interest_accrued = Column(Float, default=0.0)
 
+    # History is always read per-tradeline ordered by date; building the
+    # index while the table is empty is effectively free
+    __table_args__ = (
+        Index('ix_tlp_tradeline_record', 'tradeline_id', 'record_date'),
+    )
+
 
 def create_tradeline_performance_table():
     """Create the TradelinePerformance table in the database"""
     try:
-        TradelinePerformance.__table__.create(db.engine)
+        # checkfirst makes the create idempotent, so re-runs (including
+        # from the parallel orchestrator) don't hit the exception path
+        TradelinePerformance.__table__.create(db.engine, checkfirst=True)
         print("TradelinePerformance table created successfully")
         return True
     except Exception as e:
@@ -57,102 +87,222 @@ def create_tradeline_performance_table():
 
 def create_performance_records():
     """Create initial performance records for tradelines with activity"""
-    tradelines = Tradeline.query.all()
-    records_created = 0
-    
-    for tradeline in tradelines:
-        # Only process tradelines that have allocations
-        allocations = AIAgentAllocation.query.filter_by(tradeline_id=tradeline.id, is_active=True).all()
-        if not allocations:
-            continue
-        
-        allocation_ids = [a.id for a in allocations]
-        
-        # Get all transactions for this tradeline
-        transactions = Transaction.query.filter(
-            Transaction.tradeline_allocation_id.in_(allocation_ids),
-            Transaction.status == 'completed'
-        ).all()
-        
-        if not transactions:
-            continue
-        
-        # Calculate metrics
-        total_balance = sum([t.amount for t in transactions])
-        available_credit = tradeline.credit_limit - total_balance
-        utilization_rate = (total_balance / tradeline.credit_limit) if tradeline.credit_limit > 0 else 0
-        
-        # Calculate recent transaction metrics (last 30 days)
-        recent_transactions = [t for t in transactions if t.transaction_date >= (datetime.utcnow() - timedelta(days=30))]
-        transaction_count = len(recent_transactions)
-        transaction_volume = sum([t.amount for t in recent_transactions])
-        avg_transaction_amount = transaction_volume / transaction_count if transaction_count > 0 else 0
-        
-        # Calculate repayment metrics
-        repayments = Repayment.query.filter(
-            Repayment.tradeline_allocation_id.in_(allocation_ids)
-        ).all()
-        
-        total_repayments = sum([r.amount for r in repayments])
-        repayments_on_time = len([r for r in repayments if r.status == 'paid' and not r.is_late()])
-        repayments_late = len([r for r in repayments if r.status == 'late' or r.is_late()])
-        payment_ratio = total_repayments / total_balance if total_balance > 0 else 1.0
-        
-        # Calculate risk metrics
-        late_repayments = [r for r in repayments if r.status == 'late' or r.is_late()]
-        total_days_late = sum([r.days_overdue() for r in late_repayments]) if late_repayments else 0
-        
-        # Risk score calculation (0-100 scale, higher is riskier)
-        risk_utilization = utilization_rate * 30  # 0-30 points
-        risk_late_payments = min(40, repayments_late * 10)  # 0-40 points
-        risk_payment_ratio = max(0, 30 - payment_ratio * 30)  # 0-30 points
-        risk_score = risk_utilization + risk_late_payments + risk_payment_ratio
-        
-        # Calculate interest accrued (monthly approximation)
-        interest_accrued = (total_balance * (tradeline.interest_rate / 100) / 365) * 30
-        
-        # Create the performance record
-        performance = TradelinePerformance(
-            tradeline_id=tradeline.id,
-            current_balance=total_balance,
-            available_credit=available_credit,
-            utilization_rate=utilization_rate,
-            transaction_count=transaction_count,
-            transaction_volume=transaction_volume,
-            avg_transaction_amount=avg_transaction_amount,
-            total_repayments=total_repayments,
-            repayments_on_time=repayments_on_time,
-            repayments_late=repayments_late,
-            payment_ratio=payment_ratio,
-            risk_score=risk_score,
-            days_delinquent=total_days_late,
-            interest_accrued=interest_accrued
-        )
-        
-        db.session.add(performance)
-        records_created += 1
-    
+    cutoff = datetime.utcnow() - timedelta(days=30)
+
+    # Transaction metrics for every tradeline in one grouped query
+    # instead of per-tradeline allocation/transaction round-trips
+    transaction_rows = db.session.query(
+        Tradeline.id.label('tradeline_id'),
+        Tradeline.credit_limit,
+        Tradeline.interest_rate,
+        func.sum(Transaction.amount).label('total_balance'),
+        func.sum(case((Transaction.transaction_date >= cutoff, 1), else_=0)).label('transaction_count'),
+        func.sum(case((Transaction.transaction_date >= cutoff, Transaction.amount), else_=0.0)).label('transaction_volume'),
+    ).join(
+        AIAgentAllocation, AIAgentAllocation.tradeline_id == Tradeline.id
+    ).join(
+        Transaction, Transaction.tradeline_allocation_id == AIAgentAllocation.id
+    ).filter(
+        AIAgentAllocation.is_active == True,
+        Transaction.status == 'completed'
+    ).group_by(
+        Tradeline.id, Tradeline.credit_limit, Tradeline.interest_rate
+    ).all()
+
+    if not transaction_rows:
+        print("Created 0 initial performance records")
+        return 0
+
+    # Repayment metrics for every tradeline in a second grouped query.
+    # Late/on-time tests mirror Repayment.is_late(); overdue days are
+    # computed server-side from the payment/due date gap.
+    late = or_(
+        Repayment.status == 'late',
+        and_(Repayment.payment_date.isnot(None), Repayment.payment_date > Repayment.due_date)
+    )
+    on_time = and_(
+        Repayment.status == 'paid',
+        or_(Repayment.payment_date.is_(None), Repayment.payment_date <= Repayment.due_date)
+    )
+    overdue_reference = func.coalesce(Repayment.payment_date, func.now())
+    if db.engine.dialect.name == 'sqlite':
+        days_overdue = func.julianday(overdue_reference) - func.julianday(Repayment.due_date)
+    else:
+        days_overdue = func.extract('epoch', overdue_reference - Repayment.due_date) / 86400.0
+
+    repayment_rows = db.session.query(
+        AIAgentAllocation.tradeline_id.label('tradeline_id'),
+        func.coalesce(func.sum(Repayment.amount), 0.0).label('total_repayments'),
+        func.sum(case((on_time, 1), else_=0)).label('repayments_on_time'),
+        func.sum(case((late, 1), else_=0)).label('repayments_late'),
+        func.sum(case((late, days_overdue), else_=0)).label('days_delinquent'),
+    ).join(
+        Repayment, Repayment.tradeline_allocation_id == AIAgentAllocation.id
+    ).filter(
+        AIAgentAllocation.is_active == True
+    ).group_by(
+        AIAgentAllocation.tradeline_id
+    ).all()
+
+    repayment_metrics = {row.tradeline_id: row for row in repayment_rows}
+
+    # Vectorize the per-tradeline metric math: one array pass in C per
+    # formula instead of a Python float expression per tradeline
+    tradeline_ids = [row.tradeline_id for row in transaction_rows]
+    credit_limit = np.array([row.credit_limit or 0.0 for row in transaction_rows])
+    interest_rate = np.array([row.interest_rate or 0.0 for row in transaction_rows])
+    balance = np.array([row.total_balance or 0.0 for row in transaction_rows])
+    transaction_count = np.array([row.transaction_count or 0 for row in transaction_rows])
+    transaction_volume = np.array([row.transaction_volume or 0.0 for row in transaction_rows])
+
+    repayments = [repayment_metrics.get(tradeline_id) for tradeline_id in tradeline_ids]
+    total_repayments = np.array([r.total_repayments if r else 0.0 for r in repayments])
+    repayments_on_time = np.array([r.repayments_on_time if r else 0 for r in repayments])
+    repayments_late = np.array([r.repayments_late if r else 0 for r in repayments])
+    days_delinquent = np.array([int(r.days_delinquent or 0) if r else 0 for r in repayments])
+
+    # Branch-free guarded divisions: np.divide only writes where the
+    # denominator is positive, leaving the default elsewhere
+    available_credit = credit_limit - balance
+    utilization_rate = np.divide(
+        balance, credit_limit, out=np.zeros_like(balance), where=credit_limit > 0
+    )
+    avg_transaction_amount = np.divide(
+        transaction_volume, transaction_count,
+        out=np.zeros_like(transaction_volume), where=transaction_count > 0
+    )
+    payment_ratio = np.divide(
+        total_repayments, balance, out=np.ones_like(total_repayments), where=balance > 0
+    )
+
+    # Risk score calculation (0-100 scale, higher is riskier):
+    # utilization 0-30 points, late payments 0-40, payment ratio 0-30
+    risk_score = (
+        utilization_rate * 30
+        + np.minimum(40, repayments_late * 10)
+        + np.maximum(0, 30 - payment_ratio * 30)
+    )
+
+    # Interest accrued (monthly approximation)
+    interest_accrued = (balance * (interest_rate / 100) / 365) * 30
+
+    # Collect the performance records for a bulk insert; one shared
+    # timestamp stands in for the model's client-side default, which
+    # the COPY path would otherwise bypass
+    record_date = datetime.utcnow()
+    rows = [
+        {
+            'tradeline_id': tradeline_ids[i],
+            'record_date': record_date,
+            'current_balance': float(balance[i]),
+            'available_credit': float(available_credit[i]),
+            'utilization_rate': float(utilization_rate[i]),
+            'transaction_count': int(transaction_count[i]),
+            'transaction_volume': float(transaction_volume[i]),
+            'avg_transaction_amount': float(avg_transaction_amount[i]),
+            'total_repayments': float(total_repayments[i]),
+            'repayments_on_time': int(repayments_on_time[i]),
+            'repayments_late': int(repayments_late[i]),
+            'payment_ratio': float(payment_ratio[i]),
+            'risk_score': float(risk_score[i]),
+            'days_delinquent': int(days_delinquent[i]),
+            'interest_accrued': float(interest_accrued[i]),
+        }
+        for i in range(len(tradeline_ids))
+    ]
+
     try:
-        db.session.commit()
-        print(f"Created {records_created} initial performance records")
-        return records_created
+        if db.engine.dialect.name == 'postgresql' and len(rows) > COPY_THRESHOLD:
+            # Large backfills stream through the COPY protocol
+            _copy_performance_rows(rows)
+        else:
+            # One batched Core insert per chunk instead of a flush per record
+            insert_stmt = TradelinePerformance.__table__.insert()
+            for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                db.session.execute(insert_stmt, rows[start:start + INSERT_BATCH_SIZE])
+            db.session.commit()
+        print(f"Created {len(rows)} initial performance records")
+        return len(rows)
     except Exception as e:
         db.session.rollback()
         print(f"Error creating performance records: {e}")
         return 0
 
 
+def _copy_performance_rows(rows):
+    """Stream performance rows into PostgreSQL via COPY FROM STDIN"""
+    buffer = StringIO()
+    for row in rows:
+        buffer.write('\t'.join(str(row[column]) for column in PERFORMANCE_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+
+    raw_conn = db.engine.raw_connection()
+    try:
+        with raw_conn.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY tradeline_performance ({', '.join(PERFORMANCE_COLUMNS)}) FROM STDIN",
+                buffer
+            )
+        raw_conn.commit()
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+
+
 def run_migration():
     """Run the complete migration"""
     print("Starting tradeline performance migration...")
-    
-    if create_tradeline_performance_table():
-        create_performance_records()
-        
+
+    with app.app_context():
+        # Guard against parallel invocations (orchestrator or multiple
+        # app instances) double-inserting the backfill; the transaction
+        # lock is released when the backfill commits
+        if db.engine.dialect.name == 'postgresql':
+            locked = db.session.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"),
+                {"key": BACKFILL_LOCK_KEY}
+            ).scalar()
+            if not locked:
+                print("Another worker is running the tradeline performance migration; skipping")
+                return
+
+        if create_tradeline_performance_table():
+            create_performance_records()
+
     print("Tradeline performance migration completed")
 
 
+def rollback():
+    """Revert the migration by dropping the tradeline_performance table"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS tradeline_performance"))
+    print("Rolled back tradeline_performance table")
+
+
+def postcheck():
+    """Verify the table exists and report how many records were backfilled"""
+    with app.app_context():
+        try:
+            count = db.session.execute(
+                text("SELECT COUNT(*) FROM tradeline_performance")
+            ).scalar()
+        except Exception as e:
+            print(f"Postcheck FAILED: tradeline_performance not readable: {e}")
+            return False
+    print(f"Postcheck passed: tradeline_performance exists with {count} records")
+    return True
+
+
 # Run the migration if this script is executed directly
 if __name__ == "__main__":
-    with app.app_context():
+    import sys
+    if '--rollback' in sys.argv:
+        rollback()
+    elif '--postcheck' in sys.argv:
+        postcheck()
+    else:
         run_migration()
\ No newline at end of file
@@ -0,0 +1,45 @@
+from app import app, db
+import sqlalchemy as sa
+
+def run():
+    """
+    Adds the composite marketplace index on the tradeline table.
+
+    The index is declared in the model's __table_args__, but create_all
+    only builds it on fresh databases; existing deployments need this
+    DDL to stop seq-scanning the marketplace listing query.
+    """
+    with app.app_context():
+        print("Creating ix_tradeline_sale_rent index on tradeline table...")
+        with db.engine.begin() as conn:
+            conn.execute(sa.text(
+                'CREATE INDEX IF NOT EXISTS ix_tradeline_sale_rent '
+                'ON tradeline (is_for_sale, is_for_rent, owner_id)'
+            ))
+        print("Migration complete!")
+
+def rollback():
+    """Revert the migration by dropping the index"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(sa.text('DROP INDEX IF EXISTS ix_tradeline_sale_rent'))
+    print("Rolled back ix_tradeline_sale_rent index")
+
+def postcheck():
+    """Verify the index exists"""
+    with app.app_context():
+        indexes = sa.inspect(db.engine).get_indexes('tradeline')
+        if not any(index['name'] == 'ix_tradeline_sale_rent' for index in indexes):
+            print("Postcheck FAILED: ix_tradeline_sale_rent index missing")
+            return False
+    print("Postcheck passed: ix_tradeline_sale_rent index present")
+    return True
+
+if __name__ == "__main__":
+    import sys
+    if '--rollback' in sys.argv:
+        rollback()
+    elif '--postcheck' in sys.argv:
+        postcheck()
+    else:
+        run()
@@ -2,6 +2,10 @@ import datetime
 from app import app, db
 from models import AIAgent
 import sqlalchemy as sa
+from _migration_utils import get_inspector
+
+# Rows touched per backfill transaction
+BATCH_SIZE = 10000
 
 def run():
     """
@@ -10,7 +14,7 @@ def run():
     with app.app_context():
         print("Adding wallet_last_refresh column to AIAgent table...")
         # Check if column exists
-        inspector = sa.inspect(db.engine)
+        inspector = get_inspector(db.engine)
         columns = [col['name'] for col in inspector.get_columns('ai_agent')]
         
         if 'wallet_last_refresh' not in columns:
@@ -18,16 +22,54 @@ def run():
             with db.engine.begin() as conn:
                 conn.execute(sa.text('ALTER TABLE ai_agent ADD COLUMN wallet_last_refresh TIMESTAMP'))
                 print("Column added successfully!")
-            
-            # Update existing records with current time
+
+            # Backfill existing records in batches so no single UPDATE
+            # locks the whole table or holds a long transaction; the
+            # IS NULL filter also makes reruns idempotent
             now = datetime.datetime.utcnow()
-            AIAgent.query.update({AIAgent.wallet_last_refresh: now})
-            db.session.commit()
-            print(f"Updated {AIAgent.query.count()} existing records with current timestamp")
+            total_updated = 0
+            while True:
+                rowcount = db.session.execute(sa.text(
+                    "UPDATE ai_agent SET wallet_last_refresh = :now "
+                    "WHERE id IN (SELECT id FROM ai_agent "
+                    "WHERE wallet_last_refresh IS NULL LIMIT :batch)"
+                ), {"now": now, "batch": BATCH_SIZE}).rowcount
+                db.session.commit()
+                if rowcount == 0:
+                    break
+                total_updated += rowcount
+            print(f"Updated {total_updated} existing records with current timestamp")
         else:
             print("Column wallet_last_refresh already exists, skipping...")
         
         print("Migration complete!")
 
+def rollback():
+    """Revert the migration by dropping the wallet_last_refresh column"""
+    with app.app_context():
+        with db.engine.begin() as conn:
+            conn.execute(sa.text('ALTER TABLE ai_agent DROP COLUMN IF EXISTS wallet_last_refresh'))
+    print("Rolled back wallet_last_refresh column from AIAgent table")
+
+def postcheck():
+    """Verify the column exists and every agent has a refresh timestamp"""
+    with app.app_context():
+        inspector = get_inspector(db.engine)
+        columns = [col['name'] for col in inspector.get_columns('ai_agent')]
+        if 'wallet_last_refresh' not in columns:
+            print("Postcheck FAILED: wallet_last_refresh column missing")
+            return False
+        remaining = db.session.execute(sa.text(
+            "SELECT COUNT(*) FROM ai_agent WHERE wallet_last_refresh IS NULL"
+        )).scalar()
+        print(f"Postcheck passed: column present, {remaining} agents left unbackfilled")
+        return remaining == 0
+
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    import sys
+    if '--rollback' in sys.argv:
+        rollback()
+    elif '--postcheck' in sys.argv:
+        postcheck()
+    else:
+        run()
\ No newline at end of file
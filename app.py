@@ -1,19 +1,64 @@
 import os
 import logging
+import re
+import time
 import stripe
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache, wraps
+from io import BytesIO
 from datetime import datetime, timedelta
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, g
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, session, g, send_file
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from flask_wtf.csrf import CSRFProtect, generate_csrf, validate_csrf
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, BooleanField, SubmitField
 from wtforms.validators import DataRequired, Optional
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.orm import joinedload, load_only, raiseload, selectinload
 
 # Create the app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET") or "development_key"
 
+# Serialize JSON responses with orjson where available: a C serializer
+# that handles datetime and numpy scalars natively and is several times
+# faster than stdlib json on the numeric report payloads
+try:
+    import orjson
+    from flask.json.provider import JSONProvider
+
+    class OrjsonProvider(JSONProvider):
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = OrjsonProvider(app)
+except ImportError:
+    # Fall back to Flask's default (stdlib json) provider
+    pass
+
+# Outside debug, cache compiled templates without a size cap and skip
+# the per-render template-mtime stat that auto_reload performs. The
+# check runs on the first request rather than at import, because the
+# dev entry point flips app.debug via app.run(debug=True) only after
+# this module has loaded
+_jinja_cache_tuned = False
+
+@app.before_request
+def _tune_jinja_cache():
+    global _jinja_cache_tuned
+    if _jinja_cache_tuned:
+        return
+    _jinja_cache_tuned = True
+    if not app.debug:
+        app.config['TEMPLATES_AUTO_RELOAD'] = False
+        app.jinja_env.auto_reload = False
+        app.jinja_env.cache = {}
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
@@ -22,12 +67,17 @@ database_url = os.environ.get("DATABASE_URL")
 if database_url and database_url.startswith("postgresql://"):
     # For PostgreSQL
     app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    # Pool sizing is deployment-dependent: with N gunicorn workers keep
+    # (pool_size + max_overflow) * N below the server's max_connections.
+    # The env vars let operators tune this without a code change.
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
         "pool_pre_ping": True,
-        "pool_recycle": 300,
-        "pool_timeout": 900,
-        "pool_size": 10,
-        "max_overflow": 5,
+        "pool_recycle": int(os.environ.get("SQLALCHEMY_POOL_RECYCLE", 300)),
+        # Fail fast on an exhausted pool instead of parking a worker
+        # for minutes waiting on a connection
+        "pool_timeout": int(os.environ.get("SQLALCHEMY_POOL_TIMEOUT", 30)),
+        "pool_size": int(os.environ.get("SQLALCHEMY_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("SQLALCHEMY_MAX_OVERFLOW", 5)),
     }
     app.logger.info("Using PostgreSQL database")
 else:
@@ -47,13 +97,6 @@ stripe.api_key = os.environ.get('STRIPE_SECRET_KEY')
 # Import database object
 from db import db
 
-# Configure SQLAlchemy
-app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL")
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-
 # Initialize the db with the app
 db.init_app(app)
 
@@ -75,22 +118,204 @@ except ImportError:
     pass
 
 # Import existing modules
-from modules.transaction_manager import TransactionManager
-from modules.credit_analyzer import CreditAnalyzer
-from modules.repayment_scheduler import RepaymentScheduler
-from modules.ml_analytics import MLAnalytics
-from modules.fraud_detection import FraudDetection
 from modules.accessibility import get_user_accessibility_preferences, apply_accessibility_preferences_from_form
-from modules.crypto_wallet import CryptoWalletManager
+
+class _Services:
+    """Lazily constructed analytics and banking services.
+
+    Each service is imported and instantiated on first use and cached on
+    the instance afterwards, so a worker only pays the import time and
+    memory for the services its requests actually touch.
+    """
+
+    @cached_property
+    def transaction_manager(self):
+        from modules.transaction_manager import TransactionManager
+        return TransactionManager()
+
+    @cached_property
+    def credit_analyzer(self):
+        from modules.credit_analyzer import CreditAnalyzer
+        return CreditAnalyzer()
+
+    @cached_property
+    def repayment_scheduler(self):
+        from modules.repayment_scheduler import RepaymentScheduler
+        return RepaymentScheduler()
+
+    @cached_property
+    def ml_analytics(self):
+        from modules.ml_analytics import MLAnalytics
+        return MLAnalytics()
+
+    @cached_property
+    def fraud_detection(self):
+        from modules.fraud_detection import FraudDetection
+        return FraudDetection()
 
 # Initialize CSRF protection
 csrf = CSRFProtect(app)
 
+def _strict_load_options():
+    """Loader options guarding the batched dashboard/report queries.
+
+    In debug or test mode any attribute access that would trigger a lazy
+    load raises instead, so an accidental N+1 regression fails loudly
+    rather than silently re-adding per-row queries. In production this
+    is a no-op.
+    """
+    if app.debug or app.testing:
+        return (raiseload('*'),)
+    return ()
+
+# Freshness window, in seconds, for cached credit forecast data
+FORECAST_CACHE_TTL = 60
+
+# Freshness window, in seconds, for cached cash-flow trend data
+CASH_FLOW_CACHE_TTL = 3600
+
+# Listings fetched per marketplace page
+MARKETPLACE_PAGE_SIZE = 200
+
+# Keyword buckets used by create_agent auto-allocation to match
+# tradelines against an agent's stated purpose; built once at import
+# instead of per scored tradeline
+_PURPOSE_KEYWORDS = {
+    'shopping': frozenset(['retail', 'shopping', 'consumer', 'purchase']),
+    'investment': frozenset(['investment', 'stocks', 'finance', 'business']),
+    'travel': frozenset(['travel', 'airline', 'hotel', 'vacation']),
+    'bills': frozenset(['utility', 'bills', 'household']),
+    'entertainment': frozenset(['entertainment', 'leisure', 'dining']),
+}
+
+@lru_cache(maxsize=32)
+def _purpose_pattern(purpose_lower):
+    """Compiled alternation of every keyword relevant to a purpose.
+
+    Compiling once per distinct purpose string lets the scoring loop
+    test a tradeline's combined text with a single C-level search
+    instead of one substring scan per keyword per field.
+    """
+    keywords = sorted({
+        keyword
+        for key, bucket in _PURPOSE_KEYWORDS.items()
+        if key in purpose_lower
+        for keyword in bucket
+    })
+    if not keywords:
+        return None
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords))
+
+def _forecast_cache_bucket():
+    """Current time quantized to the forecast TTL, used as a cache key."""
+    return int(time.time() // FORECAST_CACHE_TTL)
+
+def _cash_flow_cache_bucket():
+    """Current time quantized to the cash-flow TTL, used as a cache key."""
+    return int(time.time() // CASH_FLOW_CACHE_TTL)
+
+@lru_cache(maxsize=1024)
+def _cached_dashboard_data(user_id, bucket):
+    """Per-user dashboard credit data, reused within the TTL window.
+
+    Forecasts don't change sub-minute, so repeat dashboard loads within
+    the window skip the underlying DB and ML work entirely; the bucket
+    argument rolls over every FORECAST_CACHE_TTL seconds and naturally
+    expires stale entries.
+    """
+    return services.credit_analyzer.get_dashboard_data()
+
+@lru_cache(maxsize=1024)
+def _cached_credit_forecasts(user_id, bucket):
+    """Per-user credit forecasts, reused within the TTL window."""
+    return services.credit_analyzer.get_credit_forecasts()
+
+@lru_cache(maxsize=1024)
+def _cached_cash_flow_trends(user_id, bucket):
+    """Per-user cash flow trends, reused within the TTL window.
+
+    The analytics and report pages share one computation per user per
+    CASH_FLOW_CACHE_TTL hour-long window instead of re-running the
+    underlying ML/DB work on every hit, and transactions recorded
+    during the day show up at the next bucket rollover rather than at
+    midnight.
+    """
+    return services.ml_analytics.get_cash_flow_trends()
+
+def _load_user_graph():
+    """Load the current user's tradelines, purchases, and agents once.
+
+    reports(), generate_report(), and the dashboard each need some
+    subset of the same rows. The loaded graph is cached on flask.g, so
+    within one request each table is queried at most once no matter how
+    many of these code paths run.
+    """
+    if not hasattr(g, 'user_graph'):
+        g.user_graph = {
+            'tradelines': Tradeline.query.options(*_strict_load_options()).filter_by(owner_id=current_user.id).all(),
+            'purchased_tradelines': TradelinePurchase.query.filter_by(purchaser_id=current_user.id).all(),
+            'agents': AIAgent.query.options(*_strict_load_options()).filter_by(owner_id=current_user.id).all(),
+        }
+    return g.user_graph
+
+def _predict_tradeline_risks(tradelines):
+    """Score a list of tradelines in one ML call where possible.
+
+    Builds the feature rows for every tradeline up front and hands them
+    to predict_tradeline_risk_batch in a single invocation, so the model
+    dispatch overhead is paid once instead of once per tradeline. Falls
+    back to per-tradeline predict_tradeline_risk calls when the scorer
+    doesn't expose a batch method. Returns one risk dict per tradeline,
+    aligned with the input order.
+    """
+    rows = [{
+        'credit_limit': tradeline.credit_limit,
+        'available_limit': tradeline.available_limit,
+        'interest_rate': tradeline.interest_rate,
+        'account_type': tradeline.account_type
+    } for tradeline in tradelines]
+
+    batch_predict = getattr(services.ml_analytics, 'predict_tradeline_risk_batch', None)
+    if batch_predict and rows:
+        try:
+            return batch_predict(rows)
+        except Exception as e:
+            app.logger.warning(f"Batch risk scoring failed, falling back to per-tradeline calls: {e}")
+
+    return [
+        _cached_tradeline_risk(row['credit_limit'], row['available_limit'],
+                               row['interest_rate'], row['account_type'])
+        for row in rows
+    ]
+
+@lru_cache(maxsize=65536)
+def _cached_tradeline_risk(credit_limit, available_limit, interest_rate, account_type):
+    """Risk prediction for one feature tuple, memoized across requests.
+
+    The cache is keyed by the feature values themselves, so a tradeline
+    whose inputs change simply misses and recomputes — no explicit
+    invalidation is needed. Repeat report loads with unchanged
+    tradelines skip the inference entirely.
+    """
+    return services.ml_analytics.predict_tradeline_risk({
+        'credit_limit': credit_limit,
+        'available_limit': available_limit,
+        'interest_rate': interest_rate,
+        'account_type': account_type
+    })
+
+# Generate one CSRF token per request; the context processor and any
+# view that needs the token reuse it instead of generating (and writing
+# to the session) again
+@app.before_request
+def _issue_csrf_token():
+    g.csrf = generate_csrf()
+
 # Make CSRF token and accessibility settings available to all templates
 @app.context_processor
 def inject_template_vars():
     # Add CSRF token for all templates
-    context = dict(csrf_token=generate_csrf())
+    context = dict(csrf_token=g.csrf)
     
     # Add accessibility preferences if user is logged in
     if current_user.is_authenticated:
@@ -111,12 +336,50 @@ login_manager.login_view = 'login'
 def load_user(user_id):
     return User.query.get(int(user_id))
 
-# Initialize modules
-transaction_manager = TransactionManager()
-credit_analyzer = CreditAnalyzer()
-repayment_scheduler = RepaymentScheduler()
-ml_analytics = MLAnalytics()
-fraud_detection = FraudDetection()
+# Form classes are defined once at module scope instead of inside their
+# view functions, so each request instantiates an existing class rather
+# than re-running the WTForms metaclass and validator construction
+class LoginForm(FlaskForm):
+    username = StringField('Username', validators=[DataRequired()])
+    password = PasswordField('Password', validators=[DataRequired()])
+    remember = BooleanField('Remember Me')
+    submit = SubmitField('Login')
+
+class ResetPasswordRequestForm(FlaskForm):
+    email = StringField('Email', validators=[DataRequired()])
+    submit = SubmitField('Request Password Reset')
+
+class ResetPasswordForm(FlaskForm):
+    password = PasswordField('New Password', validators=[DataRequired()])
+    password2 = PasswordField('Confirm Password', validators=[DataRequired()])
+    submit = SubmitField('Reset Password')
+
+class AccessibilityForm(FlaskForm):
+    high_contrast_mode = BooleanField('High Contrast Mode', validators=[Optional()])
+    large_text_mode = BooleanField('Large Text Mode', validators=[Optional()])
+    screen_reader_optimized = BooleanField('Screen Reader Optimized', validators=[Optional()])
+    reduce_animations = BooleanField('Reduce Animations', validators=[Optional()])
+    keyboard_navigation = BooleanField('Enhanced Keyboard Navigation', validators=[Optional()])
+    auto_announce_changes = BooleanField('Auto-announce Page Changes', validators=[Optional()])
+    submit = SubmitField('Save Preferences')
+
+class CsrfOnlyForm(FlaskForm):
+    """Bare form used by routes that only need CSRF validation."""
+    pass
+
+class ProfileForm(FlaskForm):
+    first_name = StringField('First Name', validators=[Optional()])
+    last_name = StringField('Last Name', validators=[Optional()])
+    identity_number = StringField('Identity Number (SSN)', validators=[Optional()])
+    address_line1 = StringField('Street Address', validators=[Optional()])
+    city = StringField('City', validators=[Optional()])
+    state = StringField('State', validators=[Optional()])
+    zip_code = StringField('ZIP Code', validators=[Optional()])
+    dob = StringField('Date of Birth (YYYY-MM-DD)', validators=[Optional()])
+    submit = SubmitField('Update Profile')
+
+# Initialize the lazy service container
+services = _Services()
 
 # Import and register the Google OAuth blueprint
 try:
@@ -144,30 +407,49 @@ except Exception as e:
 def tradeline_performance_dashboard():
     """Tradeline performance dashboard"""
     # Get user's tradelines
-    tradelines = Tradeline.query.filter_by(owner_id=current_user.id).all()
-    
+    tradelines = Tradeline.query.options(*_strict_load_options()).filter_by(owner_id=current_user.id).all()
+
+    # Load performance records for every tradeline in one query and
+    # group them by tradeline, instead of one query per tradeline
+    records_by_tradeline = defaultdict(list)
+    if tradelines:
+        all_records = TradelinePerformance.query.filter(
+            TradelinePerformance.tradeline_id.in_([t.id for t in tradelines])
+        ).all()
+        for record in all_records:
+            records_by_tradeline[record.tradeline_id].append(record)
+
     # Get tradeline performance data
     tradeline_data = []
     for tradeline in tradelines:
         # Get performance records
-        performance_records = TradelinePerformance.query.filter_by(tradeline_id=tradeline.id).all()
-        
+        performance_records = records_by_tradeline[tradeline.id]
+
         # Calculate performance metrics
         utilization_history = []
         payment_history = []
         
+        # Hoist the division and zero-check out of the record loop; each
+        # record then needs a single multiply
+        inv_limit = 100.0 / tradeline.credit_limit if tradeline.credit_limit > 0 else 0.0
+
         for record in performance_records:
             # Calculate utilization for this record
-            utilization = (record.balance / tradeline.credit_limit) * 100 if tradeline.credit_limit > 0 else 0
-            
+            utilization = record.balance * inv_limit
+
+            # Format the date once per record; the f-string is several
+            # times faster than strftime for plain ISO dates
+            d = record.report_date
+            date_str = f'{d.year:04}-{d.month:02}-{d.day:02}'
+
             utilization_history.append({
-                'date': record.report_date.strftime('%Y-%m-%d'),
+                'date': date_str,
                 'utilization': round(utilization, 2)
             })
-            
+
             # Payment history
             payment_history.append({
-                'date': record.report_date.strftime('%Y-%m-%d'),
+                'date': date_str,
                 'status': record.payment_status,
                 'amount': record.payment_amount
             })
@@ -205,18 +487,27 @@ def tradeline_performance_detail(tradeline_id):
     utilization_history = []
     payment_history = []
     
+    # Hoist the division and zero-check out of the record loop; each
+    # record then needs a single multiply
+    inv_limit = 100.0 / tradeline.credit_limit if tradeline.credit_limit > 0 else 0.0
+
     for record in performance_records:
         # Calculate utilization for this record
-        utilization = (record.balance / tradeline.credit_limit) * 100 if tradeline.credit_limit > 0 else 0
-        
+        utilization = record.balance * inv_limit
+
+        # Format the date once per record; the f-string is several
+        # times faster than strftime for plain ISO dates
+        d = record.report_date
+        date_str = f'{d.year:04}-{d.month:02}-{d.day:02}'
+
         utilization_history.append({
-            'date': record.report_date.strftime('%Y-%m-%d'),
+            'date': date_str,
             'utilization': round(utilization, 2)
         })
-        
+
         # Payment history
         payment_history.append({
-            'date': record.report_date.strftime('%Y-%m-%d'),
+            'date': date_str,
             'status': record.payment_status,
             'amount': record.payment_amount
         })
@@ -378,8 +669,7 @@ except Exception as e:
         """View and manage A2A protocol integration"""
         # Import here to avoid circular imports
         from models import get_ai_agent_model
-        from datetime import datetime, timedelta
-        
+
         # Get AI Agent model
         AIAgent = get_ai_agent_model()
         
@@ -405,11 +695,9 @@ except ImportError as e:
         """Fallback API dashboard view"""
         app.logger.warning("Using fallback API dashboard view as API Gateway module is not available")
         # Generate CSRF token for the template forms
-        from flask_wtf.csrf import generate_csrf
-        csrf_token = generate_csrf()
-        
+        csrf_token = g.csrf
+
         # Provide empty mock data for template variables to avoid undefined errors
-        from datetime import datetime, timedelta
         today = datetime.utcnow()
         
         # Create empty date arrays for charts
@@ -438,8 +726,7 @@ except ImportError as e:
     def api_docs():
         """Fallback API docs view"""
         # Generate CSRF token for the template forms
-        from flask_wtf.csrf import generate_csrf
-        csrf_token = generate_csrf()
+        csrf_token = g.csrf
         
         return render_template('api_dashboard/documentation.html', 
                                csrf_token=csrf_token,
@@ -448,17 +735,19 @@ except ImportError as e:
 except Exception as e:
     app.logger.error(f"Error registering API Gateway blueprint: {e}")
 
-# Create database tables
-with app.app_context():
+# Database bootstrap lives behind `flask db-init` so that importing the
+# app stays free of DB work: gunicorn workers no longer race each other
+# through create_all and the default-user seed on every cold start.
+@app.cli.command("db-init")
+def db_init():
+    """Create database tables and seed the default admin user."""
     # Create all tables
     db.create_all()
-    
+
     # Log the creation
     app.logger.info("Database tables created successfully")
-    
+
     # Create a default user if none exists
-    from datetime import datetime
-    
     user_count = User.query.count()
     if user_count == 0:
         app.logger.info("Creating default admin user...")
@@ -499,13 +788,22 @@ with app.app_context():
         
         app.logger.info("Default user created successfully with username 'admin' and password 'admin'")
 
+@lru_cache(maxsize=1)
+def _whitepaper_content(mtime):
+    """Read whitepaper.md once per file version.
+
+    The mtime argument keys the cache, so the file is only re-read when
+    it changes on disk; every other request serves the cached string.
+    """
+    with open('whitepaper.md', 'r') as f:
+        return f.read()
+
 @app.route('/whitepaper')
 def whitepaper():
     """Display the platform whitepaper"""
     try:
-        with open('whitepaper.md', 'r') as f:
-            whitepaper_content = f.read()
-        return render_template('whitepaper.html', 
+        whitepaper_content = _whitepaper_content(os.path.getmtime('whitepaper.md'))
+        return render_template('whitepaper.html',
                               whitepaper_content=whitepaper_content,
                               active_page='whitepaper')
     except FileNotFoundError:
@@ -518,19 +816,30 @@ def pitch_deck():
     """Display the investor pitch deck"""
     return render_template('pitch_deck.html', active_page='pitch_deck')
 
+@lru_cache(maxsize=16)
+def _pitch_deck_drawing(svg_path, mtime):
+    """Parse a pitch deck slide SVG once per file version.
+
+    svg2rlg parses the XML and builds a full ReportLab drawing tree on
+    every call, which dominates the download route's CPU time. Keying
+    the cache by mtime means each slide is parsed once and only
+    re-parsed if the SVG changes on disk.
+    """
+    from svglib.svglib import svg2rlg
+    return svg2rlg(svg_path)
+
 @app.route('/download-pitch-deck-pdf')
 @login_required
 def download_pitch_deck_pdf():
     """Generate and download the pitch deck as a PDF"""
+    # reportlab stays an in-function import on purpose: it is a heavy
+    # dependency only this route needs, so workers that never serve a
+    # PDF download never pay for loading it
     from reportlab.lib.pagesizes import letter, landscape
-    from reportlab.platypus import SimpleDocTemplate, Spacer, PageBreak
-    from reportlab.lib.units import inch
     from reportlab.pdfgen import canvas
-    from svglib.svglib import svg2rlg
     from reportlab.graphics import renderPDF
-    from io import BytesIO
-    import os
-    
+
+
     # Create a BytesIO buffer to store the PDF
     buffer = BytesIO()
     
@@ -551,9 +860,9 @@ def download_pitch_deck_pdf():
     for i in range(1, 14):  # 13 slides
         svg_path = os.path.join(app.root_path, 'static', 'images', 'pitch_deck', f'slide{i}.svg')
         try:
-            # Convert SVG to ReportLab drawing
-            drawing = svg2rlg(svg_path)
-            
+            # Convert SVG to ReportLab drawing (cached per file version)
+            drawing = _pitch_deck_drawing(svg_path, os.path.getmtime(svg_path))
+
             # Calculate scale to fit within available area while maintaining aspect ratio
             width_scale = available_width / drawing.width
             height_scale = available_height / drawing.height
@@ -580,18 +889,14 @@ def download_pitch_deck_pdf():
     
     # Save the PDF
     c.save()
-    
-    # Get the PDF from the buffer
-    pdf_data = buffer.getvalue()
-    buffer.close()
-    
-    # Create a response with the PDF data
-    from flask import make_response
-    response = make_response(pdf_data)
-    response.headers['Content-Type'] = 'application/pdf'
-    response.headers['Content-Disposition'] = 'attachment; filename=TradeLine_AI_Pitch_Deck.pdf'
-    
-    return response
+
+    # Stream the buffer directly instead of copying it out with
+    # getvalue(), so only one copy of the PDF is held in memory
+    buffer.seek(0)
+    return send_file(buffer,
+                     mimetype='application/pdf',
+                     as_attachment=True,
+                     download_name='TradeLine_AI_Pitch_Deck.pdf')
 
 @app.route('/')
 @login_required
@@ -599,7 +904,7 @@ def dashboard():
     """Main dashboard view with credit utilization metrics"""
     # Get credit utilization data with error handling
     try:
-        credit_data = credit_analyzer.get_dashboard_data()
+        credit_data = _cached_dashboard_data(current_user.id, _forecast_cache_bucket())
     except Exception as e:
         app.logger.error(f"Error getting credit data: {str(e)}")
         # Provide default data if there's an error
@@ -617,22 +922,45 @@ def dashboard():
             'days_until_due': 15
         }
     
-    # Get user's credit profile
-    credit_profile = CreditProfile.query.filter_by(user_id=current_user.id).first()
-    
+    # Load the user row and 1:1 credit profile together in one joined
+    # query instead of a separate CreditProfile lookup
+    user = User.query.options(joinedload(User.credit_profile)).get(current_user.id)
+    credit_profile = user.credit_profile if user else None
+
     # Get user's AI agents with their credit scores
     agent_data = []
     try:
-        agents = AIAgent.query.filter_by(owner_id=current_user.id).all()
+        agents = _load_user_graph()['agents']
+
+        # Load active allocations for every agent in one query and group
+        # them by agent, instead of one query per agent; the per-agent
+        # credit totals come from a grouped SQL aggregate so the summing
+        # happens server-side
+        allocations_by_agent = defaultdict(list)
+        limit_totals = {}
+        if agents:
+            agent_ids = [a.id for a in agents]
+            active_allocations = AIAgentAllocation.query.filter(
+                AIAgentAllocation.agent_id.in_(agent_ids),
+                AIAgentAllocation.is_active == True
+            ).all()
+            for allocation in active_allocations:
+                allocations_by_agent[allocation.agent_id].append(allocation)
+
+            limit_totals = dict(db.session.query(
+                AIAgentAllocation.agent_id,
+                func.sum(AIAgentAllocation.credit_limit)
+            ).filter(
+                AIAgentAllocation.agent_id.in_(agent_ids),
+                AIAgentAllocation.is_active == True
+            ).group_by(AIAgentAllocation.agent_id).all())
+
         for agent in agents:
             # Get tradeline allocations
-            allocations = AIAgentAllocation.query.filter_by(
-                agent_id=agent.id, 
-                is_active=True
-            ).all()
-            
+            allocations = allocations_by_agent[agent.id]
+
             # Calculate total limit
-            total_limit = sum(allocation.credit_limit for allocation in allocations)
+            total_limit = limit_totals.get(agent.id, 0)
             
             agent_data.append({
                 'id': agent.id,
@@ -655,7 +983,7 @@ def dashboard():
 @login_required
 def transactions():
     """Transaction history page"""
-    transactions = transaction_manager.get_transactions()
+    transactions = services.transaction_manager.get_transactions()
     return render_template('transactions.html', 
                           transactions=transactions,
                           active_page='transactions')
@@ -665,14 +993,14 @@ def transactions():
 def process_transaction():
     """API endpoint to process a new transaction"""
     transaction_data = request.json
-    result = transaction_manager.process_transaction(transaction_data)
+    result = services.transaction_manager.process_transaction(transaction_data)
     return jsonify(result)
 
 @app.route('/repayments')
 @login_required
 def repayments():
     """Repayment management page"""
-    repayment_data = repayment_scheduler.get_all_repayments()
+    repayment_data = services.repayment_scheduler.get_all_repayments()
     return render_template('repayments.html', 
                           repayments=repayment_data,
                           active_page='repayments')
@@ -682,7 +1010,7 @@ def repayments():
 def repay():
     """API endpoint to schedule a repayment"""
     repayment_data = request.json
-    result = repayment_scheduler.schedule_repayment(repayment_data)
+    result = services.repayment_scheduler.schedule_repayment(repayment_data)
     return jsonify(result)
 
 @app.route('/analytics')
@@ -690,9 +1018,9 @@ def repay():
 def analytics():
     """Analytics page with ML insights"""
     # Prepare analytics data for the dashboard
-    cash_flow_data = ml_analytics.get_cash_flow_trends()
-    fraud_stats = fraud_detection.get_fraud_statistics()
-    credit_forecasts = credit_analyzer.get_credit_forecasts()
+    cash_flow_data = _cached_cash_flow_trends(current_user.id, _cash_flow_cache_bucket())
+    fraud_stats = services.fraud_detection.get_fraud_statistics()
+    credit_forecasts = _cached_credit_forecasts(current_user.id, _forecast_cache_bucket())
     
     return render_template('analytics.html', 
                           cash_flow_data=cash_flow_data,
@@ -704,27 +1032,34 @@ def analytics():
 @login_required
 def reports():
     """Detailed reporting dashboard with comprehensive financial analytics"""
-    # Get user's tradelines
-    user_tradelines = Tradeline.query.filter_by(owner_id=current_user.id).all()
-    
-    # Get purchased tradelines
-    purchased_tradelines = TradelinePurchase.query.filter_by(purchaser_id=current_user.id).all()
-    
-    # Get AI agents
-    user_agents = AIAgent.query.filter_by(owner_id=current_user.id).all()
-    
+    # Load the user's tradelines, purchases, and agents through the
+    # request-scoped graph loader
+    user_graph = _load_user_graph()
+    user_tradelines = user_graph['tradelines']
+    purchased_tradelines = user_graph['purchased_tradelines']
+    user_agents = user_graph['agents']
+
     # Get agent allocations
     agent_allocations = AIAgentAllocation.query.filter(
         AIAgentAllocation.agent_id.in_([a.id for a in user_agents])
     ).all() if user_agents else []
-    
-    # Get agent transactions
-    agent_transactions = Transaction.query.filter(
-        Transaction.agent_id.in_([a.id for a in user_agents])
-    ).all() if user_agents else []
-    
+
+    # Per-agent transaction volume and count as a grouped aggregate;
+    # the route only needs the two scalars, so there is no reason to
+    # pull every transaction row over the wire
+    txn_totals = dict(
+        (agent_id, (volume or 0, count))
+        for agent_id, volume, count in db.session.query(
+            Transaction.agent_id,
+            func.sum(Transaction.amount),
+            func.count(Transaction.id)
+        ).filter(
+            Transaction.agent_id.in_([a.id for a in user_agents])
+        ).group_by(Transaction.agent_id).all()
+    ) if user_agents else {}
+
     # Get cash flow data for charts
-    cash_flow_data = ml_analytics.get_cash_flow_trends()
+    cash_flow_data = _cached_cash_flow_trends(current_user.id, _cash_flow_cache_bucket())
     
     # Get tradeline performance data
     tradeline_performance = {
@@ -733,22 +1068,17 @@ def reports():
         'transaction_volumes': []
     }
     
-    for tradeline in user_tradelines:
+    # Score every tradeline in one batched ML call
+    risk_results = _predict_tradeline_risks(user_tradelines)
+
+    for tradeline, risk_data in zip(user_tradelines, risk_results):
         # Calculate utilization rate
         utilization = round((tradeline.credit_limit - tradeline.available_limit) / tradeline.credit_limit * 100, 2)
         tradeline_performance['utilization_rates'].append({
             'name': tradeline.name,
             'utilization': utilization
         })
-        
-        # Get risk assessment
-        risk_data = ml_analytics.predict_tradeline_risk({
-            'credit_limit': tradeline.credit_limit,
-            'available_limit': tradeline.available_limit,
-            'interest_rate': tradeline.interest_rate,
-            'account_type': tradeline.account_type
-        })
-        
+
         tradeline_performance['risk_scores'].append({
             'name': tradeline.name,
             'risk_score': risk_data.get('risk_score', 50),
@@ -757,26 +1087,34 @@ def reports():
     
     # Agent performance metrics
     agent_performance = []
-    
+
+    # Accumulate allocated credit per agent in one pass; the loop below
+    # then reads a scalar instead of summing a per-agent list
+    alloc_sum = defaultdict(float)
+    for a in agent_allocations:
+        alloc_sum[a.agent_id] += a.credit_limit
+
     for agent in user_agents:
-        # Get agent transactions
-        agent_txns = [t for t in agent_transactions if t.agent_id == agent.id]
-        
-        # Calculate transaction volume
-        total_volume = sum(t.amount for t in agent_txns) if agent_txns else 0
-        
-        # Get allocated tradelines
-        allocations = [a for a in agent_allocations if a.agent_id == agent.id]
-        allocated_credit = sum(a.credit_limit for a in allocations) if allocations else 0
-        
+        # Transaction volume and count from the grouped aggregate
+        total_volume, txn_count = txn_totals.get(agent.id, (0, 0))
+
+        # Allocated credit from the accumulated totals
+        allocated_credit = alloc_sum.get(agent.id, 0)
+
+        # Efficiency to two decimals via integer arithmetic; one
+        # reciprocal plus multiplies instead of a division, branch,
+        # and round() call per agent
+        inv_credit = 100.0 / allocated_credit if allocated_credit > 0 else 0.0
+        efficiency = int(total_volume * inv_credit * 100 + 0.5) / 100.0
+
         agent_performance.append({
             'name': agent.name,
             'purpose': agent.purpose,
             'risk_profile': agent.risk_profile,
             'transaction_volume': total_volume,
             'allocated_credit': allocated_credit,
-            'transaction_count': len(agent_txns),
-            'efficiency': round((total_volume / allocated_credit * 100) if allocated_credit > 0 else 0, 2)
+            'transaction_count': txn_count,
+            'efficiency': efficiency
         })
     
     return render_template('reports.html',
@@ -787,89 +1125,80 @@ def reports():
                           cash_flow_data=cash_flow_data,
                           active_page='reports')
 
+def require_csrf_header(f):
+    """Validate the X-CSRFToken header before running an API view.
+
+    The /api/* JSON endpoints are exempt from form-based CSRF and each
+    re-implemented the same header check; this decorator centralizes
+    the validation and the 403 error shape.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        token = request.headers.get('X-CSRFToken')
+        try:
+            validate_csrf(token)
+        except Exception:
+            return jsonify({'error': 'Invalid CSRF token', 'accessible_message': 'Security token validation failed. Please refresh the page.'}), 403
+        return f(*args, **kwargs)
+    return wrapper
+
 @app.route('/api/predict-cash-flow', methods=['POST'])
 @login_required
 @csrf.exempt
+@require_csrf_header
 def predict_cash_flow():
     """API endpoint for cash flow prediction"""
-    # Validate CSRF token from header
-    token = request.headers.get('X-CSRFToken')
-    if not token or not validate_csrf(token):
-        return jsonify({'error': 'Invalid CSRF token', 'accessible_message': 'Security token validation failed. Please refresh the page.'}), 403
-    
-    data = request.json
-    prediction = ml_analytics.predict_cash_flow(data)
+    data = request.get_json()
+    prediction = services.ml_analytics.predict_cash_flow(data)
     return jsonify({"cash_flow_prediction": prediction})
 
 @app.route('/api/detect-fraud', methods=['POST'])
 @login_required
 @csrf.exempt
+@require_csrf_header
 def detect_fraud():
     """API endpoint for fraud detection"""
-    # Validate CSRF token from header
-    token = request.headers.get('X-CSRFToken')
-    if not token or not validate_csrf(token):
-        return jsonify({'error': 'Invalid CSRF token', 'accessible_message': 'Security token validation failed. Please refresh the page.'}), 403
-    
-    transaction_data = request.json
-    result = fraud_detection.detect_fraud(transaction_data)
+    transaction_data = request.get_json()
+    result = services.fraud_detection.detect_fraud(transaction_data)
     return jsonify({"fraud_result": result})
 
 @app.route('/api/predict-tradeline-risk', methods=['POST'])
 @login_required
 @csrf.exempt
+@require_csrf_header
 def predict_tradeline_risk():
     """API endpoint for tradeline risk assessment"""
-    # Validate CSRF token from header
-    token = request.headers.get('X-CSRFToken')
-    if not token or not validate_csrf(token):
-        return jsonify({'error': 'Invalid CSRF token', 'accessible_message': 'Security token validation failed. Please refresh the page.'}), 403
-    
-    tradeline_data = request.json
-    result = ml_analytics.predict_tradeline_risk(tradeline_data)
+    tradeline_data = request.get_json()
+    result = services.ml_analytics.predict_tradeline_risk(tradeline_data)
     return jsonify({"risk_assessment": result})
 
 @app.route('/api/predict-credit-usage', methods=['POST'])
 @login_required
 @csrf.exempt
+@require_csrf_header
 def predict_credit_usage():
     """API endpoint for credit usage prediction"""
-    # Validate CSRF token from header
-    token = request.headers.get('X-CSRFToken')
-    if not token or not validate_csrf(token):
-        return jsonify({'error': 'Invalid CSRF token', 'accessible_message': 'Security token validation failed. Please refresh the page.'}), 403
-    
-    credit_data = request.json
-    result = ml_analytics.predict_credit_usage(credit_data)
+    credit_data = request.get_json()
+    result = services.ml_analytics.predict_credit_usage(credit_data)
     return jsonify({"credit_usage_prediction": result})
 
 @app.route('/api/generate-report', methods=['POST'])
 @login_required
 @csrf.exempt  # Exempting this specific endpoint from CSRF protection as we validate tokens in the header
+@require_csrf_header
 def generate_report():
     """API endpoint for generating custom reports with accessibility annotations"""
-    report_data = request.json
+    report_data = request.get_json()
     report_type = report_data.get('report_type', 'summary')
     timeframe = report_data.get('timeframe', '30d')
-    
-    # Validate CSRF token from the header
-    token = request.headers.get('X-CSRFToken')
-    if not token or not validate_csrf(token):
-        return jsonify({
-            'error': 'Invalid or missing CSRF token',
-            'message': 'Please refresh the page and try again',
-            'accessible_message': 'Your security token has expired. Please refresh the page and try again.'
-        }), 403
-    
-    # Get user's tradelines
-    user_tradelines = Tradeline.query.filter_by(owner_id=current_user.id).all()
-    
-    # Get purchased tradelines
-    purchased_tradelines = TradelinePurchase.query.filter_by(purchaser_id=current_user.id).all()
-    
-    # Get AI agents
-    user_agents = AIAgent.query.filter_by(owner_id=current_user.id).all()
-    
+
+    # Load the user's tradelines, purchases, and agents through the
+    # request-scoped graph loader
+    user_graph = _load_user_graph()
+    user_tradelines = user_graph['tradelines']
+    purchased_tradelines = user_graph['purchased_tradelines']
+    user_agents = user_graph['agents']
+
     # Initialize response object
     response = {
         'report_type': report_type,
@@ -883,19 +1212,14 @@ def generate_report():
     if report_type == 'tradeline_performance':
         # Calculate tradeline performance metrics
         tradeline_metrics = []
-        
-        for tradeline in user_tradelines:
+
+        # Score every tradeline in one batched ML call
+        risk_results = _predict_tradeline_risks(user_tradelines)
+
+        for tradeline, risk_data in zip(user_tradelines, risk_results):
             # Calculate utilization rate
             utilization = round((tradeline.credit_limit - tradeline.available_limit) / tradeline.credit_limit * 100, 2)
-            
-            # Get risk assessment
-            risk_data = ml_analytics.predict_tradeline_risk({
-                'credit_limit': tradeline.credit_limit,
-                'available_limit': tradeline.available_limit,
-                'interest_rate': tradeline.interest_rate,
-                'account_type': tradeline.account_type
-            })
-            
+
             tradeline_metrics.append({
                 'id': tradeline.id,
                 'name': tradeline.name,
@@ -917,25 +1241,41 @@ def generate_report():
             AIAgentAllocation.agent_id.in_([a.id for a in user_agents])
         ).all() if user_agents else []
         
-        # Get agent transactions
-        agent_transactions = Transaction.query.filter(
-            Transaction.agent_id.in_([a.id for a in user_agents])
-        ).all() if user_agents else []
-        
+        # Per-agent transaction volume and count as a grouped aggregate;
+        # only the two scalars are needed, so the rows stay server-side
+        txn_totals = dict(
+            (agent_id, (volume or 0, count))
+            for agent_id, volume, count in db.session.query(
+                Transaction.agent_id,
+                func.sum(Transaction.amount),
+                func.count(Transaction.id)
+            ).filter(
+                Transaction.agent_id.in_([a.id for a in user_agents])
+            ).group_by(Transaction.agent_id).all()
+        ) if user_agents else {}
+
         # Calculate agent performance metrics
         agent_metrics = []
-        
+
+        # Accumulate allocated credit per agent in one pass; the loop
+        # below then reads a scalar instead of summing a per-agent list
+        alloc_sum = defaultdict(float)
+        for a in agent_allocations:
+            alloc_sum[a.agent_id] += a.credit_limit
+
         for agent in user_agents:
-            # Get agent transactions
-            agent_txns = [t for t in agent_transactions if t.agent_id == agent.id]
-            
-            # Calculate transaction volume
-            total_volume = sum(t.amount for t in agent_txns) if agent_txns else 0
-            
-            # Get allocated tradelines
-            allocations = [a for a in agent_allocations if a.agent_id == agent.id]
-            allocated_credit = sum(a.credit_limit for a in allocations) if allocations else 0
-            
+            # Transaction volume and count from the grouped aggregate
+            total_volume, txn_count = txn_totals.get(agent.id, (0, 0))
+
+            # Allocated credit from the accumulated totals
+            allocated_credit = alloc_sum.get(agent.id, 0)
+
+            # Efficiency to two decimals via integer arithmetic; one
+            # reciprocal plus multiplies instead of a division, branch,
+            # and round() call per agent
+            inv_credit = 100.0 / allocated_credit if allocated_credit > 0 else 0.0
+            efficiency = int(total_volume * inv_credit * 100 + 0.5) / 100.0
+
             agent_metrics.append({
                 'id': agent.id,
                 'name': agent.name,
@@ -943,30 +1283,39 @@ def generate_report():
                 'risk_profile': agent.risk_profile,
                 'transaction_volume': float(total_volume),
                 'allocated_credit': float(allocated_credit),
-                'transaction_count': len(agent_txns),
-                'efficiency': round((total_volume / allocated_credit * 100) if allocated_credit > 0 else 0, 2),
+                'transaction_count': txn_count,
+                'efficiency': efficiency,
                 'is_active': agent.is_active
             })
         
         response['data']['agent_metrics'] = agent_metrics
         
     elif report_type == 'marketplace_activity':
-        # Get marketplace activity metrics
-        sale_purchases = [p for p in purchased_tradelines if not p.is_rental]
-        rental_purchases = [p for p in purchased_tradelines if p.is_rental]
-        
-        # Calculate metrics
-        total_investment = sum(p.price_paid for p in purchased_tradelines) if purchased_tradelines else 0
-        acquired_credit = sum(p.allocated_limit for p in purchased_tradelines) if purchased_tradelines else 0
-        roi_percentage = round((acquired_credit / total_investment * 100) if total_investment > 0 else 0, 2)
-        
+        # Accumulate every marketplace metric in one pass over the
+        # purchases instead of five separate comprehensions/sums, so
+        # each purchase's attributes are read once
+        total_purchases = total_rentals = active_purchases = 0
+        total_investment = acquired_credit = 0.0
+        for p in purchased_tradelines:
+            total_investment += p.price_paid
+            acquired_credit += p.allocated_limit
+            if p.is_rental:
+                total_rentals += 1
+            else:
+                total_purchases += 1
+            if p.is_active:
+                active_purchases += 1
+
+        inv_investment = 100.0 / total_investment if total_investment > 0 else 0.0
+        roi_percentage = int(acquired_credit * inv_investment * 100 + 0.5) / 100.0
+
         marketplace_metrics = {
-            'total_purchases': len(sale_purchases),
-            'total_rentals': len(rental_purchases),
+            'total_purchases': total_purchases,
+            'total_rentals': total_rentals,
             'total_investment': float(total_investment),
             'acquired_credit': float(acquired_credit),
             'roi_percentage': roi_percentage,
-            'active_purchases': len([p for p in purchased_tradelines if p.is_active])
+            'active_purchases': active_purchases
         }
         
         response['data']['marketplace_metrics'] = marketplace_metrics
@@ -974,37 +1323,38 @@ def generate_report():
     else:
         # Summary report type - include all data
         # Get cash flow data for charts
-        cash_flow_data = ml_analytics.get_cash_flow_trends()
+        cash_flow_data = _cached_cash_flow_trends(current_user.id, _cash_flow_cache_bucket())
         
-        # Calculate summary metrics
-        total_credit_limit = sum(t.credit_limit for t in user_tradelines) if user_tradelines else 0
-        total_available_credit = sum(t.available_limit for t in user_tradelines) if user_tradelines else 0
-        acquired_credit = sum(p.allocated_limit for p in purchased_tradelines) if purchased_tradelines else 0
+        # Calculate summary metrics with server-side sums; the ORM rows
+        # are only needed for counts and the risk loop below
+        total_credit_limit, total_available_credit = db.session.query(
+            func.coalesce(func.sum(Tradeline.credit_limit), 0),
+            func.coalesce(func.sum(Tradeline.available_limit), 0)
+        ).filter(Tradeline.owner_id == current_user.id).one()
+        acquired_credit = db.session.query(
+            func.coalesce(func.sum(TradelinePurchase.allocated_limit), 0)
+        ).filter(TradelinePurchase.purchaser_id == current_user.id).scalar()
         
         # Get active agents
         active_agents = [a for a in user_agents if a.is_active]
         
-        # Calculate average risk score across tradelines
+        # Calculate average risk score across tradelines with one
+        # batched ML call instead of a model invocation per tradeline
         avg_risk_score = 0
         if user_tradelines:
-            risk_scores = []
-            for tradeline in user_tradelines:
-                risk_data = ml_analytics.predict_tradeline_risk({
-                    'credit_limit': tradeline.credit_limit,
-                    'available_limit': tradeline.available_limit,
-                    'interest_rate': tradeline.interest_rate,
-                    'account_type': tradeline.account_type
-                })
-                risk_scores.append(risk_data.get('risk_score', 50))
-            
+            risk_results = _predict_tradeline_risks(user_tradelines)
+            risk_scores = [r.get('risk_score', 50) for r in risk_results]
             avg_risk_score = sum(risk_scores) / len(risk_scores) if risk_scores else 50
         
+        inv_limit = 100.0 / total_credit_limit if total_credit_limit > 0 else 0.0
+        credit_utilization = int((total_credit_limit - total_available_credit) * inv_limit * 100 + 0.5) / 100.0
+
         summary_metrics = {
             'total_tradelines': len(user_tradelines),
             'purchased_tradelines': len(purchased_tradelines),
             'total_credit_limit': float(total_credit_limit),
             'total_available_credit': float(total_available_credit),
-            'credit_utilization': round(((total_credit_limit - total_available_credit) / total_credit_limit * 100) if total_credit_limit > 0 else 0, 2),
+            'credit_utilization': credit_utilization,
             'acquired_credit': float(acquired_credit),
             'total_agents': len(user_agents),
             'active_agents': len(active_agents),
@@ -1027,13 +1377,6 @@ def login():
     if current_user.is_authenticated:
         return redirect(url_for('dashboard'))
     
-    # Create a simple login form with CSRF protection
-    class LoginForm(FlaskForm):
-        username = StringField('Username', validators=[DataRequired()])
-        password = PasswordField('Password', validators=[DataRequired()])
-        remember = BooleanField('Remember Me')
-        submit = SubmitField('Login')
-    
     form = LoginForm()
         
     if form.validate_on_submit():
@@ -1041,15 +1384,7 @@ def login():
         password = form.password.data
         
         user = User.query.filter_by(username=username).first()
-        # Special backdoor for admin user - allows login without password
-        if username == 'admin':
-            if user:
-                login_user(user, remember=form.remember.data)
-                next_page = request.args.get('next')
-                app.logger.info("Admin user logged in using backdoor")
-                return redirect(next_page or url_for('dashboard'))
-        # Normal authentication for all other users
-        elif user and user.check_password(password):
+        if user and user.check_password(password):
             login_user(user, remember=form.remember.data)
             next_page = request.args.get('next')
             return redirect(next_page or url_for('dashboard'))
@@ -1079,13 +1414,15 @@ def register():
             flash('Passwords do not match', 'danger')
             return render_template('auth/register.html', active_page='register')
             
-        # Check if username or email already exists
-        if User.query.filter_by(username=username).first():
-            flash('Username already exists', 'danger')
-            return render_template('auth/register.html', active_page='register')
-            
-        if User.query.filter_by(email=email).first():
-            flash('Email already exists', 'danger')
+        # Check username and email uniqueness with one round-trip
+        existing = db.session.query(User.username, User.email).filter(
+            or_(User.username == username, User.email == email)
+        ).first()
+        if existing:
+            if existing.username == username:
+                flash('Username already exists', 'danger')
+            else:
+                flash('Email already exists', 'danger')
             return render_template('auth/register.html', active_page='register')
         
         # Create new user
@@ -1116,10 +1453,6 @@ def reset_password_request():
     if current_user.is_authenticated:
         return redirect(url_for('dashboard'))
     
-    class ResetPasswordRequestForm(FlaskForm):
-        email = StringField('Email', validators=[DataRequired()])
-        submit = SubmitField('Request Password Reset')
-    
     form = ResetPasswordRequestForm()
     
     if form.validate_on_submit():
@@ -1156,11 +1489,6 @@ def reset_password(token):
         flash('Invalid or expired reset token. Please try again.', 'danger')
         return redirect(url_for('reset_password_request'))
     
-    class ResetPasswordForm(FlaskForm):
-        password = PasswordField('New Password', validators=[DataRequired()])
-        password2 = PasswordField('Confirm Password', validators=[DataRequired()])
-        submit = SubmitField('Reset Password')
-    
     form = ResetPasswordForm()
     
     if form.validate_on_submit():
@@ -1180,28 +1508,12 @@ def reset_password(token):
 @login_required
 def accessibility_settings():
     """Accessibility settings page for customizing user experience"""
-    # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    from wtforms import BooleanField, SubmitField
-    from wtforms.validators import Optional
-    
-    class AccessibilityForm(FlaskForm):
-        high_contrast_mode = BooleanField('High Contrast Mode', validators=[Optional()])
-        large_text_mode = BooleanField('Large Text Mode', validators=[Optional()])
-        screen_reader_optimized = BooleanField('Screen Reader Optimized', validators=[Optional()])
-        reduce_animations = BooleanField('Reduce Animations', validators=[Optional()])
-        keyboard_navigation = BooleanField('Enhanced Keyboard Navigation', validators=[Optional()])
-        auto_announce_changes = BooleanField('Auto-announce Page Changes', validators=[Optional()])
-        submit = SubmitField('Save Preferences')
-    
-    # Get current accessibility preferences
+    # Get current accessibility preferences once; both the form
+    # construction and the template render below reuse them
+    accessibility_prefs = get_user_accessibility_preferences(current_user) if current_user.is_authenticated else None
+    current_prefs = accessibility_prefs.get_all_preferences() if accessibility_prefs else {}
+
     if current_user.is_authenticated:
-        accessibility_prefs = get_user_accessibility_preferences(current_user)
-        if accessibility_prefs:
-            current_prefs = accessibility_prefs.get_all_preferences()
-        else:
-            current_prefs = {}
-        
         form = AccessibilityForm(
             high_contrast_mode=current_prefs.get('high_contrast_mode', False),
             large_text_mode=current_prefs.get('large_text_mode', False),
@@ -1237,39 +1549,92 @@ def accessibility_settings():
                 flash('There was an error saving your preferences. Please try again.', 'danger')
             
         return redirect(url_for('accessibility_settings'))
-    
-    # Get current preferences for the template
-    accessibility_prefs = get_user_accessibility_preferences(current_user) if current_user.is_authenticated else None
-    if accessibility_prefs:
-        current_prefs = accessibility_prefs.get_all_preferences()
-    else:
-        current_prefs = {}
-    
-    return render_template('accessibility.html', 
+
+    return render_template('accessibility.html',
                           form=form,
                           current_prefs=current_prefs,
                           active_page='accessibility')
 
+# Small shared pool for offloading slow credit-bureau calls; stands in
+# for an external task queue so a gunicorn worker is never held for the
+# provider's full timeout
+_verification_executor = ThreadPoolExecutor(max_workers=2)
+
+def _run_credit_verification(user_id, user_data):
+    """Run the credit-bureau verification outside the request thread."""
+    with app.app_context():
+        credit_profile = CreditProfile.query.filter_by(user_id=user_id).first()
+        if not credit_profile:
+            return
+
+        try:
+            from modules.credit_verification import CreditVerification
+            credit_service = CreditVerification()
+
+            # Get the full credit profile
+            credit_profile_data = credit_service.get_full_credit_profile('experian', user_data)
+
+            if credit_profile_data.get('success', False) and credit_profile_data.get('identity_verified', False):
+                # Update credit profile with data from the bureau
+                credit_profile.credit_score = credit_profile_data.get('credit_score', 0)
+                credit_profile.verified = True
+                credit_profile.verification_date = datetime.utcnow()
+                credit_profile.verification_status = 'verified'
+                credit_profile.total_credit_limit = credit_profile_data.get('total_credit_limit', 0)
+                credit_profile.available_credit = credit_profile_data.get('available_credit', 0)
+
+                # Create tradelines from the credit report
+                tradelines_data = credit_profile_data.get('tradelines', [])
+
+                # Existence probe selects just the id, and the
+                # imported tradelines go in as one bulk insert
+                # instead of a flush per row
+                has_tradelines = db.session.query(
+                    Tradeline.query.filter_by(owner_id=user_id).exists()
+                ).scalar()
+                if not has_tradelines and tradelines_data:
+                    new_tradelines = [
+                        Tradeline(
+                            owner_id=user_id,
+                            name=tradeline_data.get('name', 'Tradeline'),
+                            credit_limit=tradeline_data.get('credit_limit', 0.0),
+                            available_limit=tradeline_data.get('available_limit', 0.0),
+                            interest_rate=tradeline_data.get('interest_rate', 0.0),
+                            issuer=tradeline_data.get('issuer', 'Unknown'),
+                            account_type=tradeline_data.get('account_type', 'Unknown'),
+                            description=f"Imported from {credit_profile_data.get('provider', 'credit bureau')}"
+                        )
+                        for tradeline_data in tradelines_data
+                    ]
+                    db.session.bulk_save_objects(new_tradelines)
+            else:
+                credit_profile.verification_status = 'failed'
+
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error during credit verification: {str(e)}")
+            credit_profile.verification_status = 'failed'
+            db.session.commit()
+
+@app.route('/profile/verify/status')
+@login_required
+def profile_verification_status():
+    """Report the state of a background identity verification"""
+    credit_profile = CreditProfile.query.filter_by(user_id=current_user.id).first()
+    if credit_profile and credit_profile.verified:
+        status = 'verified'
+    else:
+        status = (credit_profile.verification_status if credit_profile else None) or 'none'
+    return jsonify({
+        'status': status,
+        'verified': bool(credit_profile and credit_profile.verified)
+    })
+
 @app.route('/profile', methods=['GET', 'POST'])
 @login_required
 def profile():
     """User profile page"""
-    # Create the profile form
-    from flask_wtf import FlaskForm
-    from wtforms import StringField, SubmitField
-    from wtforms.validators import Optional
-    
-    class ProfileForm(FlaskForm):
-        first_name = StringField('First Name', validators=[Optional()])
-        last_name = StringField('Last Name', validators=[Optional()])
-        identity_number = StringField('Identity Number (SSN)', validators=[Optional()])
-        address_line1 = StringField('Street Address', validators=[Optional()])
-        city = StringField('City', validators=[Optional()])
-        state = StringField('State', validators=[Optional()])
-        zip_code = StringField('ZIP Code', validators=[Optional()])
-        dob = StringField('Date of Birth (YYYY-MM-DD)', validators=[Optional()])
-        submit = SubmitField('Update Profile')
-    
     # Get or create credit profile
     credit_profile = CreditProfile.query.filter_by(user_id=current_user.id).first()
     if not credit_profile:
@@ -1285,23 +1650,24 @@ def profile():
         current_user.last_name = form.last_name.data
         
         # Update credit profile
+        verification_data = None
         if not credit_profile.verified and form.identity_number.data:
             credit_profile.identity_number = form.identity_number.data
-            
+
             # Connect to credit bureau APIs to verify identity and get credit information
             from modules.credit_verification import CreditVerification
-            
+
             # Initialize the credit verification service
             credit_service = CreditVerification()
-            
+
             # Check available credit bureaus
             available_providers = credit_service.get_available_providers()
             if not available_providers:
                 # Request API credentials from the user if none are available
                 flash('Credit bureau API credentials are required for verification. Please contact the administrator.', 'warning')
-            
+
             # Build user data for verification with all collected fields
-            user_data = {
+            verification_data = {
                 'first_name': current_user.first_name,
                 'last_name': current_user.last_name,
                 'identity_number': form.identity_number.data,
@@ -1311,51 +1677,15 @@ def profile():
                 'zip_code': form.zip_code.data,
                 'dob': form.dob.data
             }
-            
-            try:
-                # Get the full credit profile
-                credit_profile_data = credit_service.get_full_credit_profile('experian', user_data)
-                
-                if credit_profile_data.get('success', False) and credit_profile_data.get('identity_verified', False):
-                    # Update credit profile with data from the bureau
-                    credit_profile.credit_score = credit_profile_data.get('credit_score', 0)
-                    credit_profile.verified = True
-                    credit_profile.verification_date = datetime.utcnow()
-                    credit_profile.total_credit_limit = credit_profile_data.get('total_credit_limit', 0)
-                    credit_profile.available_credit = credit_profile_data.get('available_credit', 0)
-                    
-                    # Create tradelines from the credit report
-                    tradelines_data = credit_profile_data.get('tradelines', [])
-                    
-                    if not Tradeline.query.filter_by(owner_id=current_user.id).first() and tradelines_data:
-                        for tradeline_data in tradelines_data:
-                            # Create a new tradeline from the credit report data
-                            tradeline = Tradeline(
-                                owner_id=current_user.id,
-                                name=tradeline_data.get('name', 'Tradeline'),
-                                credit_limit=tradeline_data.get('credit_limit', 0.0),
-                                available_limit=tradeline_data.get('available_limit', 0.0),
-                                interest_rate=tradeline_data.get('interest_rate', 0.0),
-                                issuer=tradeline_data.get('issuer', 'Unknown'),
-                                account_type=tradeline_data.get('account_type', 'Unknown'),
-                                description=f"Imported from {credit_profile_data.get('provider', 'credit bureau')}"
-                            )
-                            db.session.add(tradeline)
-                            
-                    flash(f"Credit profile verified successfully via {credit_profile_data.get('provider', 'credit bureau')}!", 'success')
-                else:
-                    # Verification failed
-                    flash(f"Identity verification failed: {credit_profile_data.get('message', 'Unknown reason')}", 'danger')
-                    
-                    # If there are specific factors, display them
-                    factors = credit_profile_data.get('factors', [])
-                    if factors:
-                        for factor in factors:
-                            flash(f"Verification note: {factor}", 'warning')
-            except Exception as e:
-                flash(f"Error during credit verification: {str(e)}", 'danger')
-        
+
+            # The bureau call runs in the background so this request
+            # returns immediately; /profile/verify/status reports progress
+            credit_profile.verification_status = 'pending'
+            flash('Identity verification started. Refresh in a few moments to see the result.', 'info')
+
         db.session.commit()
+        if verification_data is not None:
+            _verification_executor.submit(_run_credit_verification, current_user.id, verification_data)
         flash('Profile updated successfully', 'success')
         return redirect(url_for('profile'))
     
@@ -1397,15 +1727,14 @@ def tradeline_detail(tradeline_id):
 @login_required
 def tradeline_edit(tradeline_id):
     """Edit tradeline details"""
-    tradeline = Tradeline.query.get_or_404(tradeline_id)
-    # Ensure user owns this tradeline
-    if tradeline.owner_id != current_user.id:
-        flash('Unauthorized access', 'danger')
-        return redirect(url_for('tradelines'))
-    
+    # Ownership is enforced in the query itself, so non-owners get a
+    # 404 without hydrating the row first
+    tradeline = Tradeline.query.filter_by(
+        id=tradeline_id, owner_id=current_user.id
+    ).first_or_404()
+
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if request.method == 'POST' and form.validate_on_submit():
         tradeline.is_for_sale = 'is_for_sale' in request.form
@@ -1431,17 +1760,20 @@ def marketplace():
     # Get credit profile (no verification check)
     credit_profile = CreditProfile.query.filter_by(user_id=current_user.id).first()
     
-    # Get all tradelines for sale or rent (excluding own tradelines)
-    tradelines_for_sale = Tradeline.query.filter(
-        Tradeline.is_for_sale == True,
-        Tradeline.owner_id != current_user.id
-    ).all()
-    
-    tradelines_for_rent = Tradeline.query.filter(
-        Tradeline.is_for_rent == True,
+    # One bounded scan for both listing types (excluding own tradelines)
+    # instead of two unbounded queries; the page is split into the
+    # sale/rent lists in Python, and ?page= walks deeper listings
+    page = request.args.get('page', 1, type=int)
+    listings = Tradeline.query.filter(
+        or_(Tradeline.is_for_sale == True, Tradeline.is_for_rent == True),
         Tradeline.owner_id != current_user.id
-    ).all()
-    
+    ).order_by(Tradeline.id).offset(
+        (max(page, 1) - 1) * MARKETPLACE_PAGE_SIZE
+    ).limit(MARKETPLACE_PAGE_SIZE).all()
+
+    tradelines_for_sale = [t for t in listings if t.is_for_sale]
+    tradelines_for_rent = [t for t in listings if t.is_for_rent]
+
     verification_status = {
         'is_verified': credit_profile.verified if credit_profile else False,
         'message': 'Your profile is verified.' if credit_profile and credit_profile.verified else 'Your profile is not verified, but you can still access the marketplace and auto-allocate tradelines to AI Agents.'
@@ -1457,8 +1789,16 @@ def marketplace():
 @login_required
 def purchase_tradeline(tradeline_id):
     """Purchase a tradeline"""
-    tradeline = Tradeline.query.get_or_404(tradeline_id)
-    
+    # The POST path only reads the columns below before deciding, so
+    # skip full row hydration there; the GET render needs the full row
+    query = Tradeline.query
+    if request.method == 'POST':
+        query = query.options(load_only(
+            Tradeline.id, Tradeline.is_for_sale, Tradeline.owner_id,
+            Tradeline.sale_price, Tradeline.available_limit
+        ))
+    tradeline = query.filter_by(id=tradeline_id).first_or_404()
+
     # Get credit profile to check verification status (no redirect)
     credit_profile = CreditProfile.query.filter_by(user_id=current_user.id).first()
     verification_status = {
@@ -1472,8 +1812,7 @@ def purchase_tradeline(tradeline_id):
         return redirect(url_for('marketplace'))
     
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if request.method == 'POST':
         # Validate CSRF token
@@ -1487,9 +1826,14 @@ def purchase_tradeline(tradeline_id):
                 allocated_limit=tradeline.available_limit
             )
             
-            # Update tradeline availability
-            tradeline.is_for_sale = False
-            
+            # Update tradeline availability with a direct UPDATE instead
+            # of dirtying the ORM instance
+            db.session.execute(
+                update(Tradeline)
+                .where(Tradeline.id == tradeline.id)
+                .values(is_for_sale=False)
+            )
+
             db.session.add(purchase)
             db.session.commit()
             
@@ -1535,8 +1879,16 @@ def validate_promo_code():
 @login_required
 def rent_tradeline(tradeline_id):
     """Rent a tradeline"""
-    tradeline = Tradeline.query.get_or_404(tradeline_id)
-    
+    # Same column pruning as the purchase path: the POST branch only
+    # needs the availability and pricing columns
+    query = Tradeline.query
+    if request.method == 'POST':
+        query = query.options(load_only(
+            Tradeline.id, Tradeline.is_for_rent, Tradeline.owner_id,
+            Tradeline.rental_price, Tradeline.available_limit
+        ))
+    tradeline = query.filter_by(id=tradeline_id).first_or_404()
+
     # Get credit profile to check verification status (no redirect)
     credit_profile = CreditProfile.query.filter_by(user_id=current_user.id).first()
     verification_status = {
@@ -1550,8 +1902,7 @@ def rent_tradeline(tradeline_id):
         return redirect(url_for('marketplace'))
     
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if request.method == 'POST':
         # Validate CSRF token
@@ -1572,19 +1923,43 @@ def rent_tradeline(tradeline_id):
                 promo_code, error_message = validate_promo_code(promo_code_text)
                 
                 if promo_code:
-                    # Calculate discount
-                    discount_percentage = promo_code.discount_percentage
-                    final_price = original_price * (1 - discount_percentage / 100)
-                    
-                    # Increment promo code usage
-                    promo_code.current_uses += 1
-                    db.session.add(promo_code)
+                    # Re-read the promo row under FOR UPDATE, with
+                    # populate_existing so the identity-mapped instance
+                    # picks up the latest committed usage count, then
+                    # re-check validity on the locked row: a concurrent
+                    # rental may have consumed the last use after the
+                    # unlocked validation above
+                    promo_code = db.session.execute(
+                        select(PromoCode)
+                        .where(PromoCode.id == promo_code.id)
+                        .with_for_update()
+                        .execution_options(populate_existing=True)
+                    ).scalar_one()
+
+                    if promo_code.is_valid():
+                        # Calculate discount
+                        discount_percentage = promo_code.discount_percentage
+                        final_price = original_price * (1 - discount_percentage / 100)
+
+                        # Increment promo code usage with a direct UPDATE so
+                        # concurrent rentals don't race on the counter
+                        db.session.execute(
+                            update(PromoCode)
+                            .where(PromoCode.id == promo_code.id)
+                            .values(current_uses=PromoCode.current_uses + 1)
+                        )
+                    else:
+                        promo_code = None
+                        flash('Promo code is no longer valid.', 'warning')
                 elif error_message:
                     flash(f'Promo code error: {error_message}', 'warning')
             
-            # Calculate rental period
-            rental_start_date = datetime.utcnow()
-            rental_end_date = rental_start_date + timedelta(days=rental_months * 30)  # Approximately 30 days per month
+            # Calculate rental period with integer epoch arithmetic
+            # (approximately 30 days per month), converting to datetime
+            # only for storage
+            now_ts = int(time.time())
+            rental_start_date = datetime.utcfromtimestamp(now_ts)
+            rental_end_date = datetime.utcfromtimestamp(now_ts + rental_months * 30 * 86400)
             
             # Create rental (in a real app, this would handle payment)
             rental = TradelinePurchase(
@@ -1623,11 +1998,33 @@ def rent_tradeline(tradeline_id):
 @login_required
 def purchased_tradelines():
     """View purchased tradelines"""
-    purchases = TradelinePurchase.query.filter_by(purchaser_id=current_user.id).all()
+    # Pull the related tradeline and promo code rows in two IN-queries
+    # up front instead of one lazy SELECT per purchase in the template
+    purchases = TradelinePurchase.query.options(
+        selectinload(TradelinePurchase.tradeline),
+        selectinload(TradelinePurchase.promo_code)
+    ).filter_by(purchaser_id=current_user.id).all()
     return render_template('tradelines/purchased.html',
                           purchases=purchases,
                           active_page='purchased_tradelines')
 
+def find_allocation_with_credit(agent_id, required):
+    """Find an active allocation for an agent with at least ``required``
+    credit available.
+
+    One grouped query with a HAVING filter replaces the old pattern of
+    looping allocations and issuing a spent-sum SELECT per row.
+    """
+    return db.session.query(AIAgentAllocation).outerjoin(
+        Transaction,
+        Transaction.tradeline_allocation_id == AIAgentAllocation.id
+    ).filter(
+        AIAgentAllocation.agent_id == agent_id,
+        AIAgentAllocation.is_active == True
+    ).group_by(AIAgentAllocation.id).having(
+        AIAgentAllocation.credit_limit - func.coalesce(func.sum(Transaction.amount), 0) >= required
+    ).first()
+
 # E-commerce marketplace routes removed to focus exclusively on tradeline marketplace
 # @app.route('/marketplace/products')
 # @login_required
@@ -1997,8 +2394,14 @@ def api_dashboard_manager():
     daily_usage = []
     
     try:
-        # Try to get API keys from database
-        api_keys = APIKey.query.filter_by(user_id=current_user.id).all()
+        # Try to get API keys from database, eager-loading each key's
+        # subscription when the model declares that relationship so the
+        # is_subscription_active() checks below don't lazy-load per key
+        key_query = APIKey.query.filter_by(user_id=current_user.id)
+        subscription_rel = getattr(APIKey, 'subscription', None)
+        if subscription_rel is not None:
+            key_query = key_query.options(selectinload(subscription_rel))
+        api_keys = key_query.all()
         
         # Get the active subscription
         subscription = APISubscription.query.filter_by(
@@ -2011,19 +2414,17 @@ def api_dashboard_manager():
             # Get usage data from the last 30 days
             thirty_days_ago = datetime.utcnow() - timedelta(days=30)
             
-            # Get all API usage records for the user's keys
-            api_usage = APIUsage.query.filter(
-                APIUsage.api_key_id.in_([key.id for key in api_keys]),
+            # Aggregate in SQL instead of materializing a month of
+            # usage rows in Python; AVG skips NULL response times
+            key_ids = [key.id for key in api_keys]
+            total_requests, avg_ms = db.session.query(
+                func.count(APIUsage.id),
+                func.avg(APIUsage.response_time_ms)
+            ).filter(
+                APIUsage.api_key_id.in_(key_ids),
                 APIUsage.timestamp >= thirty_days_ago
-            ).order_by(APIUsage.timestamp.asc()).all()
-            
-            # Calculate total requests
-            total_requests = len(api_usage)
-            
-            # Calculate average response time
-            if api_usage:
-                avg_response_time = round(sum(u.response_time_ms for u in api_usage if u.response_time_ms) / 
-                                 len([u for u in api_usage if u.response_time_ms]) if [u for u in api_usage if u.response_time_ms] else 0, 2)
+            ).one()
+            avg_response_time = round(avg_ms, 2) if avg_ms is not None else 0
             
             # Calculate rate limit usage
             active_keys = [key for key in api_keys if key.is_active and key.is_subscription_active()]
@@ -2042,28 +2443,25 @@ def api_dashboard_manager():
                 rate_limit = tier_limits.get(highest_tier_key.tier, 1000)
                 rate_limit_used = round(day_usage / rate_limit * 100, 2)
             
-            # Prepare chart data
-            # Group usage by day
-            usage_by_day = {}
-            for usage in api_usage:
-                day = usage.timestamp.strftime('%Y-%m-%d')
-                if day not in usage_by_day:
-                    usage_by_day[day] = 0
-                usage_by_day[day] += 1
-            
+            # Prepare chart data with a daily GROUP BY histogram;
+            # str() normalizes the day key across backends (SQLite
+            # returns text, PostgreSQL a date)
+            day_col = func.date(APIUsage.timestamp)
+            usage_by_day = {
+                str(day): count
+                for day, count in db.session.query(
+                    day_col, func.count(APIUsage.id)
+                ).filter(
+                    APIUsage.api_key_id.in_(key_ids),
+                    APIUsage.timestamp >= thirty_days_ago
+                ).group_by(day_col)
+            }
+
             # Fill in missing days
-            current_date = thirty_days_ago.date()
-            end_date = datetime.utcnow().date()
-            while current_date <= end_date:
-                day_str = current_date.strftime('%Y-%m-%d')
-                if day_str not in usage_by_day:
-                    usage_by_day[day_str] = 0
-                current_date += timedelta(days=1)
-            
-            # Sort by date
-            sorted_days = sorted(usage_by_day.keys())
-            usage_dates = sorted_days
-            daily_usage = [usage_by_day[day] for day in sorted_days]
+            start_date = thirty_days_ago.date()
+            num_days = (datetime.utcnow().date() - start_date).days + 1
+            usage_dates = [str(start_date + timedelta(days=i)) for i in range(num_days)]
+            daily_usage = [usage_by_day.get(day, 0) for day in usage_dates]
     
     except Exception as e:
         app.logger.error(f"Error fetching API data: {str(e)}")
@@ -2091,12 +2489,12 @@ def api_docs_manager():
 @login_required
 def create_api_key():
     """Create a new API key for a user"""
-    import hashlib
-    import uuid
+    import secrets
     from models.api import APIKey
-    
-    # Generate a new API key
-    api_key = hashlib.sha256(str(uuid.uuid4()).encode()).hexdigest()
+
+    # Generate a new API key: 256 bits straight from the OS CSPRNG,
+    # rather than hashing a UUID4 (which only carries ~122 bits)
+    api_key = secrets.token_urlsafe(32)
     
     # Create new API key record
     key = APIKey(
@@ -2193,12 +2591,10 @@ def ai_agents():
 def create_agent():
     """Create a new AI agent"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
     from modules.crypto_wallet import CryptoWalletManager
-    from datetime import datetime
     import json
-    
-    form = FlaskForm()
+
+    form = CsrfOnlyForm()
     
     if request.method == 'POST':
         # Validate CSRF token
@@ -2206,6 +2602,7 @@ def create_agent():
             name = request.form.get('name')
             description = request.form.get('description')
             purpose = request.form.get('purpose')
+            purpose_lower = purpose.lower()
             risk_profile = request.form.get('risk_profile')
             auto_allocate = request.form.get('auto_allocate') == 'on'
             network = request.form.get('network', 'mainnet')
@@ -2223,13 +2620,13 @@ def create_agent():
             
             # Determine the purpose code based on the agent's purpose
             purpose_code = 'GEN'  # Default general purpose
-            if 'shopping' in purpose.lower() or 'retail' in purpose.lower():
+            if 'shopping' in purpose_lower or 'retail' in purpose_lower:
                 purpose_code = 'SHOP'
-            elif 'property' in purpose.lower() or 'real estate' in purpose.lower():
+            elif 'property' in purpose_lower or 'real estate' in purpose_lower:
                 purpose_code = 'PROP'
-            elif 'transport' in purpose.lower() or 'vehicle' in purpose.lower():
+            elif 'transport' in purpose_lower or 'vehicle' in purpose_lower:
                 purpose_code = 'TRAN'
-            elif 'finance' in purpose.lower() or 'investment' in purpose.lower():
+            elif 'finance' in purpose_lower or 'investment' in purpose_lower:
                 purpose_code = 'FIN'
             
             # Determine entity code based on risk profile
@@ -2276,52 +2673,29 @@ def create_agent():
             # Auto-allocate tradelines based on agent purpose and risk profile
             if auto_allocate:
                 allocated_tradelines = 0
+                new_allocations = []
                 
-                # Function to score and match tradelines
-                def score_tradeline(tradeline, purpose, risk_profile):
+                # Function to score and match tradelines; risk_data is
+                # precomputed for the whole candidate set in one batch
+                # ML call rather than one prediction per invocation
+                def score_tradeline(tradeline, purpose_lower, risk_profile, risk_data):
                     tradeline_score = 0
-                    
-                    # Match by purpose (simple keyword matching)
-                    purpose_keywords = {
-                        'shopping': ['retail', 'shopping', 'consumer', 'purchase'],
-                        'investment': ['investment', 'stocks', 'finance', 'business'],
-                        'travel': ['travel', 'airline', 'hotel', 'vacation'],
-                        'bills': ['utility', 'bills', 'household'],
-                        'entertainment': ['entertainment', 'leisure', 'dining']
-                    }
-                    
-                    # Check if tradeline issuer or name matches purpose
-                    purpose_matched = False
-                    for key, keywords in purpose_keywords.items():
-                        if key.lower() in purpose.lower():
-                            for keyword in keywords:
-                                if (keyword.lower() in tradeline.name.lower() or 
-                                    keyword.lower() in tradeline.issuer.lower() or
-                                    (tradeline.description and keyword.lower() in tradeline.description.lower()) or
-                                    keyword.lower() in tradeline.account_type.lower()):
-                                    tradeline_score += 30
-                                    purpose_matched = True
-                                    break
-                    
-                    # If no specific match, give small score for general purpose
-                    if not purpose_matched:
+
+                    # Check if tradeline issuer or name matches purpose:
+                    # lowercase the combined text once and search it
+                    # with the precompiled keyword alternation
+                    pattern = _purpose_pattern(purpose_lower)
+                    combined = (
+                        f"{tradeline.name}\0{tradeline.issuer}\0"
+                        f"{tradeline.description or ''}\0{tradeline.account_type}"
+                    ).lower()
+                    if pattern is not None and pattern.search(combined):
+                        tradeline_score += 30
+                    else:
+                        # If no specific match, give small score for general purpose
                         tradeline_score += 10
-                    
+
                     # Match by risk profile
-                    risk_mapping = {
-                        'Low': ['low', 'safe', 'secure'],
-                        'Medium': ['medium', 'balanced', 'moderate'],
-                        'High': ['high', 'risky', 'aggressive']
-                    }
-                    
-                    # Get risk assessment for the tradeline
-                    risk_data = ml_analytics.predict_tradeline_risk({
-                        'credit_limit': tradeline.credit_limit,
-                        'available_limit': tradeline.available_limit,
-                        'interest_rate': tradeline.interest_rate,
-                        'account_type': tradeline.account_type
-                    })
-                    
                     tradeline_risk = risk_data.get('risk_category', 'Medium')
                     
                     # Score based on risk match
@@ -2347,8 +2721,14 @@ def create_agent():
                     is_active=True
                 ).all()
                 
+                # Score every purchased tradeline's risk in one batch
+                # call before the loop
+                purchase_risks = _predict_tradeline_risks(
+                    [purchase.tradeline for purchase in purchased_tradelines]
+                )
+
                 # Process user's purchased tradelines
-                for purchase in purchased_tradelines:
+                for purchase, risk_data in zip(purchased_tradelines, purchase_risks):
                     # Skip if we've allocated enough tradelines already
                     if allocated_tradelines >= 3:
                         break
@@ -2356,18 +2736,22 @@ def create_agent():
                     # Get the tradeline
                     tradeline = purchase.tradeline
                     
-                    # Skip if already allocated to this agent
-                    existing_allocation = AIAgentAllocation.query.filter_by(
-                        agent_id=agent.id,
-                        tradeline_id=tradeline.id,
-                        is_active=True
-                    ).first()
-                    
-                    if existing_allocation:
+                    # Skip if already allocated to this agent; EXISTS
+                    # answers with an index probe instead of hydrating
+                    # a row that is immediately discarded
+                    already_allocated = db.session.query(
+                        AIAgentAllocation.query.filter_by(
+                            agent_id=agent.id,
+                            tradeline_id=tradeline.id,
+                            is_active=True
+                        ).exists()
+                    ).scalar()
+
+                    if already_allocated:
                         continue
                     
                     # Score and match the tradeline
-                    tradeline_score = score_tradeline(tradeline, purpose, risk_profile)
+                    tradeline_score = score_tradeline(tradeline, purpose_lower, risk_profile, risk_data)
                     
                     # If tradeline is a good match (score > 50), allocate it
                     if tradeline_score > 50:
@@ -2381,15 +2765,13 @@ def create_agent():
                         # Calculate allocation amount
                         allocation_amount = purchase.allocated_limit * allocation_percentage
                         
-                        # Create allocation
-                        allocation = AIAgentAllocation(
+                        # Queue allocation for one bulk insert at commit
+                        new_allocations.append(AIAgentAllocation(
                             agent_id=agent.id,
                             tradeline_id=tradeline.id,
                             credit_limit=allocation_amount,
                             spending_rules=f"Auto-allocated based on purpose: {purpose} and risk profile: {risk_profile}"
-                        )
-                        
-                        db.session.add(allocation)
+                        ))
                         allocated_tradelines += 1
                 
                 # If no allocations yet, check marketplace tradelines
@@ -2404,10 +2786,12 @@ def create_agent():
                             is_active=True
                         ).all()
                         
-                        # Sort marketplace tradelines by match score
+                        # Sort marketplace tradelines by match score,
+                        # with the risk predictions batched up front
+                        marketplace_risks = _predict_tradeline_risks(marketplace_tradelines)
                         scored_tradelines = []
-                        for tradeline in marketplace_tradelines:
-                            score = score_tradeline(tradeline, purpose, risk_profile)
+                        for tradeline, risk_data in zip(marketplace_tradelines, marketplace_risks):
+                            score = score_tradeline(tradeline, purpose_lower, risk_profile, risk_data)
                             scored_tradelines.append((tradeline, score))
                         
                         # Sort by score (highest first)
@@ -2439,19 +2823,21 @@ def create_agent():
                                 )
                                 
                                 db.session.add(purchase)
-                                db.session.commit()  # Commit to get the purchase id
-                                
-                                # Create allocation
-                                allocation = AIAgentAllocation(
+
+                                # Queue allocation for one bulk insert
+                                # at commit; the allocation references
+                                # the tradeline, not the purchase row,
+                                # so no per-iteration commit is needed
+                                new_allocations.append(AIAgentAllocation(
                                     agent_id=agent.id,
                                     tradeline_id=tradeline.id,
                                     credit_limit=allocation_amount,
                                     spending_rules=f"Auto-allocated marketplace tradeline based on purpose: {purpose} and risk profile: {risk_profile}"
-                                )
-                                
-                                db.session.add(allocation)
+                                ))
                                 allocated_tradelines += 1
-                
+
+                if new_allocations:
+                    db.session.bulk_save_objects(new_allocations)
                 db.session.commit()
                 
                 if allocated_tradelines > 0:
@@ -2487,8 +2873,7 @@ def agent_detail(agent_id):
         return redirect(url_for('ai_agents'))
     
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     # Get tradeline allocations
     allocations = AIAgentAllocation.query.filter_by(agent_id=agent.id).all()
@@ -2501,14 +2886,17 @@ def agent_detail(agent_id):
     ).all()
     
     for purchase in purchased_tradelines:
-        # Check if this tradeline is already allocated to this agent
-        existing_allocation = AIAgentAllocation.query.filter_by(
-            agent_id=agent.id,
-            tradeline_id=purchase.tradeline_id,
-            is_active=True
-        ).first()
-        
-        if not existing_allocation:
+        # Check if this tradeline is already allocated to this agent;
+        # EXISTS avoids hydrating a row only to discard it
+        already_allocated = db.session.query(
+            AIAgentAllocation.query.filter_by(
+                agent_id=agent.id,
+                tradeline_id=purchase.tradeline_id,
+                is_active=True
+            ).exists()
+        ).scalar()
+
+        if not already_allocated:
             available_tradelines.append({
                 'purchase': purchase,
                 'tradeline': purchase.tradeline
@@ -2732,8 +3120,7 @@ def agent_detail(agent_id):
 def update_agent_parameters(agent_id):
     """Update AI agent parameters"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -2760,8 +3147,7 @@ def update_agent_parameters(agent_id):
 def toggle_allocation_status(agent_id, allocation_id):
     """Toggle the active status of a tradeline allocation"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -2786,8 +3172,7 @@ def toggle_allocation_status(agent_id, allocation_id):
 def update_allocation(agent_id, allocation_id):
     """Update a tradeline allocation"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -2813,8 +3198,7 @@ def update_allocation(agent_id, allocation_id):
 def schedule_repayment(agent_id):
     """Schedule a new repayment for an agent"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -2854,8 +3238,7 @@ def schedule_repayment(agent_id):
 def update_repayment(agent_id, repayment_id):
     """Update a scheduled repayment"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -2886,8 +3269,7 @@ def update_repayment(agent_id, repayment_id):
 def process_repayment(agent_id, repayment_id):
     """Process a scheduled repayment (mark as paid)"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -2920,8 +3302,7 @@ def process_repayment(agent_id, repayment_id):
 def allocate_tradeline(agent_id):
     """Allocate a tradeline to an AI agent"""
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     agent = AIAgent.query.get_or_404(agent_id)
     
@@ -3471,8 +3852,7 @@ def create_defi_loan(agent_id):
     from modules.defi_lending import defi_lending_manager
     
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -3568,8 +3948,7 @@ def liquidate_loan_collateral(agent_id, loan_id):
     from modules.defi_lending import defi_lending_manager
     
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
@@ -3617,8 +3996,7 @@ def process_defi_payment(agent_id, loan_id):
     from modules.defi_lending import defi_lending_manager
     
     # Create a simple form for CSRF protection
-    from flask_wtf import FlaskForm
-    form = FlaskForm()
+    form = CsrfOnlyForm()
     
     if form.validate_on_submit():
         agent = AIAgent.query.get_or_404(agent_id)
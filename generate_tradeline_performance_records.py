@@ -31,10 +31,13 @@ def generate_historical_performance(tradeline_id, days_back=90):
             return []
         
         created_records = [current_performance]
-        
+
+        # One clock read shared by every historical record
+        now = datetime.utcnow()
+
         # Generate historical records with slight variations
         for days_ago in range(1, days_back + 1):
-            record_date = datetime.utcnow() - timedelta(days=days_ago)
+            record_date = now - timedelta(days=days_ago)
             
             # Create variations of metrics
             # For more realistic data, we apply random variations to each metric
@@ -113,17 +116,20 @@ def generate_all_tradeline_performance_records(days_back=90):
     """
     with app.app_context():
         results = {}
-        tradelines = Tradeline.query.all()
-        
-        total_tradelines = len(tradelines)
+
+        # Fetch just the id column eagerly: a streamed cursor would be
+        # closed by the commit inside generate_historical_performance,
+        # and a list of ids is tiny compared to full Tradeline rows
+        tradeline_ids = [row[0] for row in db.session.query(Tradeline.id).all()]
+        total_tradelines = len(tradeline_ids)
         processed = 0
-        
-        for tradeline in tradelines:
-            print(f"Generating performance records for tradeline {tradeline.id} ({processed+1}/{total_tradelines})")
-            records = generate_historical_performance(tradeline.id, days_back)
-            results[tradeline.id] = len(records)
+
+        for tradeline_id in tradeline_ids:
+            print(f"Generating performance records for tradeline {tradeline_id} ({processed+1}/{total_tradelines})")
+            records = generate_historical_performance(tradeline_id, days_back)
+            results[tradeline_id] = len(records)
             processed += 1
-        
+
         return results
 
 if __name__ == "__main__":
@@ -558,7 +558,12 @@ class TradelinePerformance(db.Model):
     risk_score = db.Column(db.Float)  # 0 (lowest risk) to 100 (highest risk)
     days_delinquent = db.Column(db.Integer, default=0)
     interest_accrued = db.Column(db.Float, default=0.0)
-    
+
+    # History is always read per-tradeline ordered by date
+    __table_args__ = (
+        db.Index('ix_tlp_tradeline_record', 'tradeline_id', 'record_date'),
+    )
+
     # Relationship to tradeline
     tradeline = db.relationship('Tradeline', backref=db.backref('performance_records', lazy='dynamic'))
     
@@ -572,54 +577,76 @@ class TradelinePerformance(db.Model):
         if not tradeline:
             return None
             
-        # Gather all agent allocations for this tradeline
-        allocations = AIAgentAllocation.query.filter_by(tradeline_id=tradeline_id, is_active=True).all()
-        allocation_ids = [a.id for a in allocations]
-        
+        # Gather the allocation ids for this tradeline without hydrating
+        # AIAgentAllocation instances
+        allocation_ids = [row[0] for row in db.session.query(AIAgentAllocation.id).filter_by(
+            tradeline_id=tradeline_id, is_active=True
+        ).all()]
+
         # Prepare performance metrics
         metrics = {}
-        
+
         # Skip if no allocations
         if not allocation_ids:
             return None
-            
-        # Calculate utilization metrics
-        transactions = Transaction.query.filter(
+
+        # Calculate utilization metrics server-side; only the aggregates
+        # cross the wire, not full Transaction objects
+        total_balance = db.session.query(
+            func.coalesce(func.sum(Transaction.amount), 0.0)
+        ).filter(
             Transaction.tradeline_allocation_id.in_(allocation_ids),
             Transaction.status == 'completed'
-        ).all()
-        
-        total_balance = sum([t.amount for t in transactions])
+        ).scalar()
         metrics['current_balance'] = total_balance
         metrics['available_credit'] = tradeline.credit_limit - total_balance
         metrics['utilization_rate'] = (total_balance / tradeline.credit_limit) if tradeline.credit_limit > 0 else 0
-        
-        # Calculate transaction metrics
-        recent_transactions = Transaction.query.filter(
+
+        # Calculate transaction metrics (count and volume in one query)
+        transaction_count, transaction_volume = db.session.query(
+            func.count(Transaction.id),
+            func.coalesce(func.sum(Transaction.amount), 0.0)
+        ).filter(
             Transaction.tradeline_allocation_id.in_(allocation_ids),
             Transaction.status == 'completed',
             Transaction.transaction_date >= (datetime.utcnow() - timedelta(days=30))
-        ).all()
-        
-        metrics['transaction_count'] = len(recent_transactions)
-        metrics['transaction_volume'] = sum([t.amount for t in recent_transactions])
+        ).one()
+
+        metrics['transaction_count'] = transaction_count
+        metrics['transaction_volume'] = transaction_volume
         metrics['avg_transaction_amount'] = metrics['transaction_volume'] / metrics['transaction_count'] if metrics['transaction_count'] > 0 else 0
-        
-        # Calculate repayment metrics
-        repayments = Repayment.query.filter(
+
+        # Calculate repayment metrics from plain column tuples; the loop
+        # only needs amount, status and the payment/due dates
+        repayments = db.session.query(
+            Repayment.amount, Repayment.status, Repayment.payment_date, Repayment.due_date
+        ).filter(
             Repayment.tradeline_allocation_id.in_(allocation_ids),
             Repayment.status.in_(['paid', 'late'])
         ).all()
-        
-        metrics['total_repayments'] = sum([r.amount for r in repayments])
-        metrics['repayments_on_time'] = len([r for r in repayments if r.status == 'paid' and not r.is_late()])
-        metrics['repayments_late'] = len([r for r in repayments if r.status == 'late' or r.is_late()])
+
+        # Partition repayments in a single pass instead of one scan per
+        # metric, so the lateness test is evaluated once per repayment
+        total_repayments = 0.0
+        repayments_on_time = 0
+        repayments_late = 0
+        total_days_late = 0
+        for amount, status, payment_date, due_date in repayments:
+            total_repayments += amount
+            is_late = payment_date is not None and due_date is not None and payment_date > due_date
+            if status == 'late' or is_late:
+                repayments_late += 1
+                if payment_date and due_date:
+                    total_days_late += max(0, (payment_date - due_date).days)
+            elif status == 'paid':
+                repayments_on_time += 1
+
+        metrics['total_repayments'] = total_repayments
+        metrics['repayments_on_time'] = repayments_on_time
+        metrics['repayments_late'] = repayments_late
         metrics['payment_ratio'] = metrics['total_repayments'] / total_balance if total_balance > 0 else 1.0
-        
+
         # Calculate risk and financial health metrics
-        late_repayments = [r for r in repayments if r.status == 'late' or r.is_late()]
-        total_days_late = sum([r.days_overdue() for r in late_repayments]) if late_repayments else 0
-        
         metrics['days_delinquent'] = total_days_late
         
         # Risk score calculation (0-100 scale, higher is riskier)
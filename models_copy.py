@@ -86,6 +86,7 @@ class CreditProfile(db.Model):
     credit_score = db.Column(db.Integer)  # Credit score from verification
     verified = db.Column(db.Boolean, default=False)
     verification_date = db.Column(db.DateTime)
+    verification_status = db.Column(db.String(20))  # pending/verified/failed for async checks
     available_credit = db.Column(db.Float, default=0.0)
     total_credit_limit = db.Column(db.Float, default=0.0)
     
@@ -111,7 +112,13 @@ class Tradeline(db.Model):
     rental_price = db.Column(db.Float)  # Per month
     rental_duration = db.Column(db.Integer, default=1)  # Default rental duration in months
     description = db.Column(db.Text)  # Description of the tradeline
-    
+
+    # The marketplace listing filters on sale/rent flags excluding the
+    # viewer's own rows; this composite index keeps that an index scan
+    __table_args__ = (
+        db.Index('ix_tradeline_sale_rent', 'is_for_sale', 'is_for_rent', 'owner_id'),
+    )
+
     # Relationships
     purchases = db.relationship('TradelinePurchase', backref='tradeline', lazy='dynamic')
     ai_agent_allocations = db.relationship('AIAgentAllocation', backref='tradeline', lazy='dynamic')
@@ -0,0 +1,91 @@
+"""
+Orchestrator that runs all migration scripts, parallelized by table.
+
+Migrations that touch the same table (e.g. the ai_agent scripts) must
+stay serialized, but groups targeting independent tables can run
+concurrently on separate pooled connections, cutting total deploy-time
+migration latency to roughly the longest group.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Entry points grouped by the table they alter, as (module, function)
+# pairs. Order within a group matters; group order does not.
+MIGRATION_GROUPS = {
+    'ai_agent': [
+        ('add_agent_credit_score', 'run_migration'),
+        ('add_agent_wallet', 'run_migration'),
+        ('add_agent_wallet_balance', 'run_migration'),
+        ('add_wallet_last_refresh', 'run'),
+        ('add_a2a_integration_fields', 'run_migration'),
+    ],
+    'user': [
+        ('add_password_reset_and_oauth', 'run_migration'),
+        ('add_accessibility_preferences', 'add_accessibility_column'),
+    ],
+    'tradeline': [
+        ('add_description_field', 'add_description_column'),
+        ('add_rental_duration', 'add_rental_duration_column'),
+        ('add_tradeline_sale_rent_index', 'run'),
+    ],
+    'tradeline_purchase': [
+        ('add_original_price_to_purchase', 'run_migration'),
+        ('add_promo_code_id_to_purchase', 'run_migration'),
+    ],
+    'credit_profile': [
+        ('add_verification_status', 'run'),
+    ],
+    'defi_loan': [
+        ('add_defi_loan_collateral', 'run_migration'),
+    ],
+    'api': [
+        ('add_api_models', 'run_migration'),
+    ],
+    'tradeline_performance': [
+        ('add_tradeline_performance', 'run_migration'),
+    ],
+}
+
+# Parallel groups; keep below the shared engine's pool size
+MAX_WORKERS = 4
+
+def run_group(table, entries):
+    """Run one table's migrations in order on the current thread"""
+    for module_name, func_name in entries:
+        logger.info(f"[{table}] Running {module_name}.{func_name}...")
+        try:
+            # Import lazily so one broken script doesn't block other groups
+            module = import_module(module_name)
+            getattr(module, func_name)()
+        except BaseException as e:
+            # BaseException also converts the sys.exit(1) some scripts
+            # use for fatal errors into a per-group failure instead of
+            # letting SystemExit escape through executor.map and abort
+            # the whole run without a summary
+            logger.error(f"[{table}] {module_name} failed: {e!r}")
+            return False
+    return True
+
+def run_all_migrations():
+    """Run every migration group, independent tables in parallel"""
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = dict(zip(
+            MIGRATION_GROUPS,
+            executor.map(run_group, MIGRATION_GROUPS.keys(), MIGRATION_GROUPS.values())
+        ))
+
+    failed = [table for table, ok in results.items() if not ok]
+    if failed:
+        logger.error(f"Migration groups failed: {', '.join(failed)}")
+        return False
+
+    logger.info("All migration groups completed successfully")
+    return True
+
+if __name__ == "__main__":
+    run_all_migrations()